@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, List, Sequence, Tuple
+
+from bitboard_abalone import BitBoardAbalone
+from geometry_abalone import CELLS, DIRECTIONS, DISTANCES_TO_CENTER, NEIGHBOURS, RAYS, TABLE_SIZE, bit_to_env
+from utils import MOVE_COUNT, PUSH_RATIO
+
+try:
+    import numpy as np
+except ImportError:  # numpy is in requirements.txt, without it the players evaluate the children one by one
+    np = None
+
+if TYPE_CHECKING:
+    from game_state_abalone import GameStateAbalone
+    from seahorse.game.game_layout.board import Piece
+
+HAS_NUMPY = np is not None
+
+# Bytes of the little-endian representation of a mask
+MASK_BYTES = (TABLE_SIZE + 7) // 8
+
+# Index of the padding column standing for the outside of the board in the stacked boards
+OUTSIDE = len(CELLS)
+
+# Length of the longest pushing line: 3 pieces of the player, 2 of the opponent and the cell after them
+LINE_LENGTH = 6
+
+if HAS_NUMPY:
+    CELL_INDEX = {bit: index for index, bit in enumerate(CELLS)}
+    ENV_CELL_INDEX = {bit_to_env(bit): index for index, bit in enumerate(CELLS)}
+    CELLS_ARRAY = np.array(CELLS)
+    DISTANCES_ARRAY = np.array([DISTANCES_TO_CENTER[bit] for bit in CELLS], dtype=np.float64)
+    # (61, 6): index of the neighbour of each cell in each direction
+    NEIGHBOUR_INDEX = np.array(
+        [[OUTSIDE if neighbour is None else CELL_INDEX[neighbour] for neighbour in NEIGHBOURS[bit]] for bit in CELLS]
+    )
+    # (6, 61, 6): index of the k-th cell of the line starting at each cell in each direction
+    LINE_INDEX = np.array(
+        [
+            [
+                [
+                    CELL_INDEX[line[k]] if k < len(line) else OUTSIDE
+                    for line in ((bit,) + RAYS[bit][direction] for direction in range(len(DIRECTIONS)))
+                ]
+                for bit in CELLS
+            ]
+            for k in range(LINE_LENGTH)
+        ]
+    )
+    LINE_OUTSIDE = LINE_INDEX == OUTSIDE
+
+
+def stack_boards(boards: Sequence[BitBoardAbalone]) -> np.ndarray:
+    """
+    Stacks boards in an array of cells.
+
+    Args:
+        boards (Sequence[BitBoardAbalone]): N boards
+
+    Returns:
+        np.ndarray: (N, 2, 61) array, 1 where a player has a piece
+    """
+    data = b"".join(mask.to_bytes(MASK_BYTES, "little") for board in boards for mask in board.masks)
+    bits = np.frombuffer(data, dtype=np.uint8).reshape(len(boards), 2, MASK_BYTES)
+    return np.unpackbits(bits, axis=2, bitorder="little")[:, :, CELLS_ARRAY].astype(np.int8)
+
+
+def stack_envs(envs: Sequence[Dict[Tuple[int, int], Piece]], owner_ids: Sequence[int]) -> np.ndarray:
+    """
+    Stacks the envs of BoardAbalone in an array of cells, like stack_boards without building a bitboard for each env.
+
+    Args:
+        envs (Sequence[Dict[Tuple[int, int], Piece]]): N envs
+        owner_ids (Sequence[int]): Ids of the players of the game, in playing order
+
+    Returns:
+        np.ndarray: (N, 2, 61) array, 1 where a player has a piece
+    """
+    first = owner_ids[0]
+    size = 2 * len(CELLS)
+    indices = [
+        row * size + (piece.get_owner_id() != first) * len(CELLS) + ENV_CELL_INDEX[position]
+        for row, env in enumerate(envs)
+        for position, piece in env.items()
+    ]
+    cells = np.zeros(len(envs) * size, dtype=np.int8)
+    cells[indices] = 1
+    return cells.reshape(len(envs), 2, len(CELLS))
+
+
+def count_pushes(own: np.ndarray, opp: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Counts the pushes available to a player from the line patterns 2-vs-1, 3-vs-1 and 3-vs-2.
+
+    Args:
+        own (np.ndarray): (N, 62) pieces of the player, padded with the outside
+        opp (np.ndarray): (N, 62) pieces of the opponent, padded with the outside
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (N,) number of pushes that keep the pieces on the board and of ejections
+    """
+    empty = ~(own | opp)
+    empty[:, OUTSIDE] = False
+    own_line = [own[:, LINE_INDEX[k]] for k in range(3)]
+    opp_line = [None] + [opp[:, LINE_INDEX[k]] for k in range(1, 5)]
+    line_2 = own_line[0] & own_line[1]
+    line_3 = line_2 & own_line[2]
+    pushes = 0
+    ejections = 0
+    # pattern of the pushers and index of the cell after the pushed pieces
+    for pushers, after in (
+        (line_2 & opp_line[2], 3),
+        (line_3 & opp_line[3], 4),
+        (line_3 & opp_line[3] & opp_line[4], 5),
+    ):
+        pushes = pushes + (pushers & empty[:, LINE_INDEX[after]]).sum(axis=(1, 2))
+        ejections = ejections + (pushers & LINE_OUTSIDE[after]).sum(axis=(1, 2))
+    return pushes, ejections
+
+
+def compute_features(cells: np.ndarray, push: bool = True, adjacency: bool = True) -> Dict[str, np.ndarray]:
+    """
+    Computes the features of the heuristics for stacked boards.
+
+    Args:
+        cells (np.ndarray): (N, 2, 61) array of stack_boards or stack_envs
+        push (bool): Whether to compute the push pressure, the most expensive feature
+        adjacency (bool): Whether to compute the adjacency
+
+    Returns:
+        Dict[str, np.ndarray]: (N, 2) arrays "center" (normalized distance to center),
+            "adjacency" (normalized adjacency) and "push" (push pressure, as utils.get_push_pressure) of each player
+    """
+    counts = np.maximum(cells.sum(axis=2), 1)
+    # divide distance by 5 as the max distance is 4
+    features = {"center": cells @ DISTANCES_ARRAY / 5 / counts}
+    padded = np.concatenate([cells, np.zeros(cells.shape[:2] + (1,), dtype=cells.dtype)], axis=2)
+    if adjacency:
+        neighbours = (padded[:, :, NEIGHBOUR_INDEX] * cells[:, :, :, None]).sum(axis=(2, 3))
+        features["adjacency"] = neighbours / (6 * counts)
+    if push:
+        padded = padded.astype(bool)
+        pressure = []
+        for side in range(2):
+            pushes, ejections = count_pushes(padded[:, side], padded[:, 1 - side])
+            pressure.append((PUSH_RATIO * pushes + (1 - PUSH_RATIO) * ejections) / MOVE_COUNT)
+        features["push"] = np.stack(pressure, axis=1)
+    return features
+
+
+def evaluate_boards(
+    boards: Sequence[BitBoardAbalone], scores: Sequence[Sequence[int]], sides: Sequence[int], weights: Dict[str, float]
+) -> np.ndarray:
+    """
+    Evaluates N positions with a single vectorized computation,
+    combining the features like utils.heuristic_combined.
+
+    Args:
+        boards (Sequence[BitBoardAbalone]): N boards
+        scores (Sequence[Sequence[int]]): Score of each player of each position
+        sides (Sequence[int]): Index of the player whose point of view is evaluated, for each position
+        weights (Dict[str, float]): Weight of each feature among "score", "center", "push" and "adjacency"
+
+    Returns:
+        np.ndarray: (N,) heuristic values
+    """
+    return evaluate_cells(stack_boards(boards), scores, sides, weights)
+
+
+def evaluate_cells(
+    cells: np.ndarray, scores: Sequence[Sequence[int]], sides: Sequence[int], weights: Dict[str, float]
+) -> np.ndarray:
+    """
+    Evaluates N stacked positions, combining the features like utils.heuristic_combined.
+
+    Args:
+        cells (np.ndarray): (N, 2, 61) array of stack_boards or stack_envs
+        scores (Sequence[Sequence[int]]): Score of each player of each position
+        sides (Sequence[int]): Index of the player whose point of view is evaluated, for each position
+        weights (Dict[str, float]): Weight of each feature among "score", "center", "push" and "adjacency"
+
+    Returns:
+        np.ndarray: (N,) heuristic values
+    """
+    features = compute_features(cells, push="push" in weights, adjacency="adjacency" in weights)
+    values = np.zeros((len(cells), 2))
+    if "score" in weights:
+        values += weights["score"] * np.asarray(scores, dtype=np.float64)
+    if "center" in weights:
+        values -= weights["center"] * features["center"]
+    if "push" in weights:
+        values += weights["push"] * features["push"]
+    if "adjacency" in weights:
+        values += weights["adjacency"] * features["adjacency"]
+    sides = np.asarray(sides)
+    rows = np.arange(len(cells))
+    return values[rows, sides] - values[rows, 1 - sides]
+
+
+def evaluate_game_states(states: Sequence[GameStateAbalone], weights: Dict[str, float]) -> List[float]:
+    """
+    Evaluates sibling game states for their next player with a single vectorized computation.
+
+    Args:
+        states (Sequence[GameStateAbalone]): Game states of the same game
+        weights (Dict[str, float]): Weight of each feature among "score", "center", "push" and "adjacency"
+
+    Returns:
+        List[float]: Heuristic value of each state
+    """
+    if not states:
+        return []
+    ids = [player.get_id() for player in states[0].get_players()]
+    cells = stack_envs([state.get_rep().get_env() for state in states], ids)
+    scores = [[state.scores[player_id] for player_id in ids] for state in states]
+    sides = [ids.index(state.get_next_player().get_id()) for state in states]
+    return evaluate_cells(cells, scores, sides, weights).tolist()
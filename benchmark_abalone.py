@@ -0,0 +1,303 @@
+import argparse
+import json
+import random
+from os.path import abspath, dirname, join
+from time import perf_counter
+from typing import Any, Dict, List, Optional
+
+from bitboard_abalone import MOVE_OPP_MASK, BitBoardAbalone, move_to_str
+from constants import MAX_STEP
+from geometry_abalone import bit_to_env, env_to_bit
+from main_abalone import LAYOUTS
+from move_ordering import MoveOrderer, is_ejection, is_suicide
+from my_player import ALPHA_BETA, PVS, SearchTimeout, compute_best_move_with_aspiration, score_distance_adjacency_sym
+from search_state_abalone import SearchStateAbalone
+from search_stats import SearchStats
+from transposition_table import TranspositionTable
+
+# Checked-in corpus of positions, regenerated with --generate
+POSITIONS_PATH = join(dirname(abspath(__file__)), "benchmark_positions.json")
+
+# Settings of compute_best_move_with_aspiration compared by the benchmark
+ENGINES = {
+    "alphabeta": dict(algorithm=ALPHA_BETA, window=None, reductions=False, null_move=False),
+    "pvs": dict(algorithm=PVS, window=None, reductions=False, null_move=False),
+    "aspiration": dict(algorithm=PVS, window=1, reductions=False, null_move=False),
+    "selective": dict(algorithm=PVS, window=1, reductions=True, null_move=True),
+}
+
+# Steps of the positions of the corpus taken at a fixed point of the game
+OPENING_STEP = 4
+MIDGAME_STEP = 20
+ENDGAME_STEP = MAX_STEP - 4
+
+# Probability of a push in the playouts generating the corpus, random moves rarely push
+PUSH_PROBABILITY = 0.2
+
+# Playouts tried per layout to find a position before an ejection
+MAX_PLAYOUTS = 20
+
+# Time limit of the search of a position in seconds, so that a position searched too slowly doesn't hold up the run
+DEFAULT_TIME_LIMIT = 60
+
+
+def state_to_position(name: str, config: str, state: SearchStateAbalone) -> Dict[str, Any]:
+    """
+    Describes a state with the coordinates of the env of BoardAbalone, independently of the bitboard layout.
+
+    Args:
+        name (str): Name of the position
+        config (str): Starting layout of the game
+        state (SearchStateAbalone): The state
+
+    Returns:
+        Dict[str, Any]: "name", "config", "step", "scores" and "next_side" of the position,
+            and "cells" of the pieces of each player
+    """
+    cells = []
+    for mask in state.board.masks:
+        cells.append([list(bit_to_env(bit)) for bit in range(mask.bit_length()) if mask >> bit & 1])
+    return {
+        "name": name,
+        "config": config,
+        "step": state.step,
+        "scores": list(state.scores),
+        "next_side": state.next_side,
+        "cells": cells,
+    }
+
+
+def position_to_state(position: Dict[str, Any]) -> SearchStateAbalone:
+    """
+    Builds the search state of a position of the corpus.
+
+    Args:
+        position (Dict[str, Any]): The position, as given by state_to_position
+
+    Returns:
+        SearchStateAbalone: The state
+    """
+    masks = [sum(1 << env_to_bit(i, j) for i, j in cells) for cells in position["cells"]]
+    return SearchStateAbalone(
+        BitBoardAbalone(masks, [0, 1], ["W", "B"]),
+        list(position["scores"]),
+        position["step"],
+        position["next_side"],
+    )
+
+
+def create_initial_state(config: str) -> SearchStateAbalone:
+    """
+    Builds the search state of a starting layout of main_abalone.
+
+    Args:
+        config (str): "classic", "alien" or "simplified"
+
+    Returns:
+        SearchStateAbalone: The state
+    """
+    layout = LAYOUTS[config]
+    cells = [
+        [(i, j) for i, row in enumerate(layout) for j, cell in enumerate(row) if cell == value] for value in (1, 2)
+    ]
+    return position_to_state({"cells": cells, "scores": [0, 0], "step": 0, "next_side": 0})
+
+
+def play_random_move(state: SearchStateAbalone, rng: random.Random) -> bool:
+    """
+    Plays a random move that doesn't throw a piece of the player off the board,
+    a push with probability PUSH_PROBABILITY when there is one.
+
+    Args:
+        state (SearchStateAbalone): The state, modified in place
+        rng (random.Random): Random generator
+
+    Returns:
+        bool: False if the next player has no move
+    """
+    moves = [move for move in state.generate_moves() if not is_suicide(move)]
+    if not moves:
+        return False
+    pushes = [move for move in moves if move & MOVE_OPP_MASK]
+    state.apply(rng.choice(pushes if pushes and rng.random() < PUSH_PROBABILITY else moves))
+    return True
+
+
+def generate_positions(seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Generates the corpus from seeded playouts of each starting layout:
+    an opening, a midgame, a position near the end of the game and a position where the next player can eject
+    a piece of the opponent, when a playout reaches one.
+
+    Args:
+        seed (int): Seed of the playouts
+
+    Returns:
+        List[Dict[str, Any]]: The positions
+    """
+    rng = random.Random(seed)
+    positions = []
+    for config in LAYOUTS:
+        state = create_initial_state(config)
+        while state.step < ENDGAME_STEP and not state.is_done():
+            if state.step in (OPENING_STEP, MIDGAME_STEP):
+                name = "opening" if state.step == OPENING_STEP else "midgame"
+                positions.append(state_to_position(f"{config}-{name}", config, state))
+            if not play_random_move(state, rng):
+                break
+        if state.step == ENDGAME_STEP:
+            positions.append(state_to_position(f"{config}-endgame", config, state))
+        # position where the next player can eject a piece
+        for _ in range(MAX_PLAYOUTS):
+            state = create_initial_state(config)
+            while not state.is_done() and state.step < ENDGAME_STEP and play_random_move(state, rng):
+                if state.step > OPENING_STEP and any(is_ejection(move) for move in state.generate_moves()):
+                    positions.append(state_to_position(f"{config}-ejection", config, state))
+                    break
+            else:
+                continue
+            break
+    return positions
+
+
+def benchmark_position(
+    position: Dict[str, Any],
+    engine: str,
+    depth: int,
+    table_memory_mb: float = 64,
+    time_limit: float = DEFAULT_TIME_LIMIT,
+) -> Dict[str, Any]:
+    """
+    Searches a position with an engine by iterative deepening up to a fixed depth, as MyPlayer does,
+    with a new transposition table and move ordering.
+
+    Args:
+        position (Dict[str, Any]): The position
+        engine (str): Name of the engine in ENGINES
+        depth (int): Depth of the last iteration, limited by the end of the game
+        table_memory_mb (float): Memory budget of the transposition table in MB
+        time_limit (float): Time after which the search is interrupted, in seconds
+
+    Returns:
+        Dict[str, Any]: "position", "engine", "depth" of the last completed iteration, "move" and "score" found,
+            "timeout" (whether the search was interrupted before the last iteration), "time" in seconds,
+            "nps" (nodes of the main and the quiescence searches per second)
+            and the counters of SearchStats.to_dict, such as "nodes", "cutoffs" and "branching_factor"
+    """
+    settings = dict(ENGINES[engine])
+    window = settings.pop("window")
+    state = position_to_state(position)
+    state.track_features()
+    table = TranspositionTable(table_memory_mb)
+    orderer = MoveOrderer()
+    stats = SearchStats()
+    depth = min(depth, state.max_step - state.step)
+    best_move = None
+    score = None
+    completed_depth = 0
+    timeout = False
+    start = perf_counter()
+    for iteration in range(1, depth + 1):
+        try:
+            best_move, score = compute_best_move_with_aspiration(
+                previous_score=score,
+                window=window,
+                **settings,
+                state=state,
+                depth=iteration,
+                heuristic=score_distance_adjacency_sym,
+                table=table,
+                quiescence_test=True,
+                first_move=best_move,
+                orderer=orderer,
+                stats=stats,
+                deadline=start + time_limit,
+            )
+        except SearchTimeout:
+            timeout = True
+            break
+        completed_depth = iteration
+    elapsed = perf_counter() - start
+    nodes = stats.nodes + stats.quiescence_nodes
+    return {
+        "position": position["name"],
+        "engine": engine,
+        "depth": completed_depth,
+        "move": move_to_str(best_move) if best_move is not None else None,
+        "score": score,
+        "timeout": timeout,
+        "time": elapsed,
+        "nps": nodes / elapsed if elapsed > 0 else None,
+        **stats.to_dict(),
+    }
+
+
+def summarize(results: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Sums the results of each engine over the positions.
+
+    Args:
+        results (List[Dict[str, Any]]): Results of benchmark_position
+
+    Returns:
+        Dict[str, Dict[str, Any]]: "positions", "timeouts", "time", "nodes", "quiescence_nodes", "nps", "tt_hit_rate"
+            and "cutoffs" of each engine
+    """
+    summary = {}
+    keys = ("timeout", "time", "nodes", "quiescence_nodes", "tt_probes", "tt_hits", "cutoffs")
+    for result in results:
+        total = summary.setdefault(result["engine"], dict(positions=0, **dict.fromkeys(keys, 0)))
+        total["positions"] += 1
+        for key in keys:
+            total[key] += result[key]
+    for total in summary.values():
+        nodes = total["nodes"] + total["quiescence_nodes"]
+        total["nps"] = nodes / total["time"] if total["time"] > 0 else None
+        total["tt_hit_rate"] = total.pop("tt_hits") / total["tt_probes"] if total["tt_probes"] else None
+        total["timeouts"] = total.pop("timeout")
+    return summary
+
+
+def load_positions(path: str = POSITIONS_PATH, configs: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    with open(path) as file:
+        positions = json.load(file)
+    return [position for position in positions if configs is None or position["config"] in configs]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="benchmark_abalone.py",
+        description="Times the search engines to a fixed depth on a corpus of fixed positions.",
+    )
+    parser.add_argument("-d", "--depth", type=int, default=4, help="Depth of the search.")
+    parser.add_argument(
+        "-e", "--engines", nargs="+", choices=list(ENGINES), default=list(ENGINES), help="Engines to compare."
+    )
+    parser.add_argument("-c", "--config", nargs="+", choices=list(LAYOUTS), default=None, help="Starting layouts.")
+    parser.add_argument(
+        "-t", "--time-limit", type=float, default=DEFAULT_TIME_LIMIT, help="Time limit of each search in seconds."
+    )
+    parser.add_argument("-p", "--positions", default=POSITIONS_PATH, help="JSON file of the corpus.")
+    parser.add_argument("-o", "--output", default=None, help="JSON lines file receiving the result of each search.")
+    parser.add_argument("--generate", action="store_true", help="Generates the corpus instead of benchmarking.")
+    args = parser.parse_args()
+
+    if args.generate:
+        with open(args.positions, "w") as file:
+            positions = generate_positions()
+            file.write("[\n" + ",\n".join(json.dumps(position) for position in positions) + "\n]\n")
+    else:
+        results = []
+        output = open(args.output, "w") if args.output else None
+        try:
+            for position in load_positions(args.positions, args.config):
+                for engine in args.engines:
+                    result = benchmark_position(position, engine, args.depth, time_limit=args.time_limit)
+                    results.append(result)
+                    print(json.dumps(result), flush=True)
+                    if output is not None:
+                        output.write(json.dumps(result) + "\n")
+        finally:
+            if output is not None:
+                output.close()
+        print(json.dumps(summarize(results), indent=2))
@@ -0,0 +1,500 @@
+from __future__ import annotations
+
+import random
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from board_abalone import BoardAbalone
+from geometry_abalone import (
+    CELLS,
+    DIRECTIONS,
+    EDGE_MASKS,
+    ENV_DIMENSIONS,
+    RAYS,
+    SHIFTS,
+    VALID_MASK,
+    bit_to_env,
+    env_to_bit,
+    shift_back,
+)
+from seahorse.game.game_layout.board import Piece
+from seahorse.player.player import Player
+
+# ---------------------------- Zobrist hashing ----------------------------#
+
+# Random 64-bit keys for each (player, cell) and for the player to move.
+# The generator is seeded so that hashes are stable across runs and processes.
+_zobrist_random = random.Random(2023)
+ZOBRIST_KEYS = [
+    [_zobrist_random.getrandbits(64) for _ in range(max(CELLS) + 1)] for _ in range(2)
+]
+ZOBRIST_SIDE_KEYS = [0, _zobrist_random.getrandbits(64)]
+# Key distinguishing the searches whose horizon goes past the end of the game
+ZOBRIST_ENDGAME_KEY = _zobrist_random.getrandbits(64)
+
+
+def compute_zobrist_hash(masks: List[int]) -> int:
+    """
+    Computes from scratch the Zobrist hash of the pieces of both players.
+
+    Args:
+        masks (List[int]): Pieces of each player
+
+    Returns:
+        int: 64-bit hash of the pieces
+    """
+    result = 0
+    for side, mask in enumerate(masks):
+        keys = ZOBRIST_KEYS[side]
+        while mask:
+            low = mask & -mask
+            result ^= keys[low.bit_length() - 1]
+            mask ^= low
+    return result
+
+
+# ---------------------------- Moves ----------------------------#
+
+# A move is packed in a small int:
+# the line of own_count pieces starting at the source bit moves one step in the
+# direction, pushing the opp_count opponent pieces found right after it.
+# ejected tells if the last piece of the line falls off the board.
+#   bits 0-6: source, bits 7-9: direction, bits 10-11: own_count, bits 12-13: opp_count, bit 14: ejected
+# Moves are cheap to store and compare, and don't refer to any game state.
+Move = int
+
+MOVE_DIRECTION_SHIFT = 7
+MOVE_OWN_SHIFT = 10
+MOVE_OPP_SHIFT = 12
+MOVE_SOURCE_MASK = (1 << MOVE_DIRECTION_SHIFT) - 1
+# source and direction of a move, which identify the pieces it moves
+MOVE_PATH_MASK = (1 << MOVE_OWN_SHIFT) - 1
+MOVE_OPP_MASK = 3 << MOVE_OPP_SHIFT
+MOVE_EJECTED = 1 << 14
+
+
+def encode_move(source: int, direction: int, own_count: int, opp_count: int, ejected: bool) -> Move:
+    """
+    Packs the fields of a move in an int.
+
+    Args:
+        source (int): Bit of the last piece of the line, opposite to the direction
+        direction (int): Index of the direction in DIRECTIONS
+        own_count (int): Number of pieces of the player moved
+        opp_count (int): Number of pieces of the opponent pushed
+        ejected (bool): Whether the last piece of the line falls off the board
+
+    Returns:
+        Move: The packed move
+    """
+    return (
+        source
+        | direction << MOVE_DIRECTION_SHIFT
+        | own_count << MOVE_OWN_SHIFT
+        | opp_count << MOVE_OPP_SHIFT
+        | (MOVE_EJECTED if ejected else 0)
+    )
+
+
+def decode_move(move: Move) -> Tuple[int, int, int, int, bool]:
+    """
+    Unpacks the fields of a move.
+
+    Args:
+        move (Move): The packed move
+
+    Returns:
+        Tuple[int, int, int, int, bool]: (source, direction, own_count, opp_count, ejected)
+    """
+    return (
+        move & MOVE_SOURCE_MASK,
+        move >> MOVE_DIRECTION_SHIFT & 7,
+        move >> MOVE_OWN_SHIFT & 3,
+        move >> MOVE_OPP_SHIFT & 3,
+        bool(move & MOVE_EJECTED),
+    )
+
+
+def move_to_str(move: Optional[Move]) -> str:
+    """
+    Describes a move for logs, with env coordinates.
+
+    Args:
+        move (Optional[Move]): The move
+
+    Returns:
+        str: e.g. "(8, 2)+(1, 1) x3 push 1 eject"
+    """
+    if move is None:
+        return "None"
+    source, direction, own_count, opp_count, ejected = decode_move(move)
+    text = f"{bit_to_env(source)}+{DIRECTIONS[direction]} x{own_count}"
+    if opp_count:
+        text += f" push {opp_count}"
+    if ejected:
+        text += " eject"
+    return text
+
+
+# ---------------------------- Board ----------------------------#
+
+
+class BitBoardAbalone:
+    """
+    A compact Abalone board packing the pieces of each player in an integer bitmask.
+    It converts losslessly to and from the env of BoardAbalone.
+
+    Attributes:
+        masks (List[int]): Pieces of each player, in the order of the players of the game.
+        owner_ids (List[int]): Ids of the players owning the pieces of each mask.
+        piece_types (List[str]): Piece types of the players owning the pieces of each mask.
+        hash (int): Zobrist hash of the pieces, updated incrementally by apply_move.
+    """
+
+    def __init__(
+        self, masks: List[int], owner_ids: List[int], piece_types: List[str], hash: Optional[int] = None
+    ) -> None:
+        self.masks = masks
+        self.owner_ids = owner_ids
+        self.piece_types = piece_types
+        self.hash = compute_zobrist_hash(masks) if hash is None else hash
+
+    @classmethod
+    def from_env(cls, env: Dict[Tuple[int, int], Piece], players: List[Player]) -> BitBoardAbalone:
+        """
+        Builds a bitboard from the env of a BoardAbalone.
+
+        Args:
+            env (Dict[Tuple[int, int], Piece]): The environment dictionary composed of pieces.
+            players (List[Player]): Players of the game, in playing order
+
+        Returns:
+            BitBoardAbalone: The equivalent bitboard
+        """
+        owner_ids = [player.get_id() for player in players]
+        piece_types = [getattr(player, "piece_type", None) for player in players]
+        masks = [0, 0]
+        for (i, j), piece in env.items():
+            side = owner_ids.index(piece.get_owner_id())
+            masks[side] |= 1 << env_to_bit(i, j)
+            piece_types[side] = piece.get_type()
+        return cls(masks, owner_ids, piece_types)
+
+    @classmethod
+    def from_board(cls, board: BoardAbalone, players: List[Player]) -> BitBoardAbalone:
+        return cls.from_env(board.get_env(), players)
+
+    def to_env(self) -> Dict[Tuple[int, int], Piece]:
+        """
+        Builds the env of the equivalent BoardAbalone.
+
+        Returns:
+            Dict[Tuple[int, int], Piece]: The environment dictionary composed of pieces.
+        """
+        env = {}
+        for side, mask in enumerate(self.masks):
+            while mask:
+                low = mask & -mask
+                env[bit_to_env(low.bit_length() - 1)] = Piece(
+                    piece_type=self.piece_types[side], owner_id=self.owner_ids[side]
+                )
+                mask ^= low
+        return env
+
+    def to_board(self) -> BoardAbalone:
+        return BoardAbalone(env=self.to_env(), dim=list(ENV_DIMENSIONS))
+
+    def copy(self) -> BitBoardAbalone:
+        return BitBoardAbalone(list(self.masks), self.owner_ids, self.piece_types, self.hash)
+
+    def count_pieces(self, side: int) -> int:
+        return self.masks[side].bit_count()
+
+    def iter_push_sources(self, side: int) -> Iterator[Tuple[int, int, int, int, int]]:
+        """
+        Finds the lines of a player able to push pieces of the opponent (sumito),
+        with whole-board shifts and masks along the precomputed edges of each direction.
+
+        Args:
+            side (int): Index of the player to move
+
+        Yields:
+            Tuple[int, int, int, int, int]: (direction, own_count, opp_count, ejecting sources, pushing sources)
+                for each pattern 2-vs-1, 3-vs-1 and 3-vs-2 of each direction.
+                The sources are the masks of the last pieces of the lines whose push
+                throws a piece off the board, and whose push keeps all the pieces on the board.
+        """
+        own = self.masks[side]
+        opp = self.masks[1 - side]
+        empty = VALID_MASK & ~(own | opp)
+        for direction, shift in enumerate(SHIFTS):
+            # cells whose k-th neighbour along the direction is own / opp / empty / at the edge
+            own_1 = shift_back(own, shift)
+            own_2 = shift_back(own_1, shift)
+            opp_2 = shift_back(shift_back(opp, shift), shift)
+            if not own & own_1 & opp_2:
+                # no line of 2 own pieces followed by an opponent piece
+                continue
+            opp_3 = shift_back(opp_2, shift)
+            opp_4 = shift_back(opp_3, shift)
+            empty_3 = shift_back(shift_back(shift_back(empty, shift), shift), shift)
+            empty_4 = shift_back(empty_3, shift)
+            empty_5 = shift_back(empty_4, shift)
+            edge_2 = shift_back(shift_back(EDGE_MASKS[direction], shift), shift)
+            edge_3 = shift_back(edge_2, shift)
+            edge_4 = shift_back(edge_3, shift)
+
+            # lines of 2 and 3 own pieces
+            line_2 = own & own_1
+            line_3 = line_2 & own_2
+
+            for own_count, opp_count, pushers, free, edge in (
+                (2, 1, line_2 & opp_2, empty_3, edge_2),
+                (3, 1, line_3 & opp_3, empty_4, edge_3),
+                (3, 2, line_3 & opp_3 & opp_4, empty_5, edge_4),
+            ):
+                if pushers:
+                    yield direction, own_count, opp_count, pushers & edge, pushers & free
+
+    def generate_pushes(self, side: int) -> List[Move]:
+        """
+        Generates the moves of a player pushing pieces of the opponent, the ones ejecting a piece first.
+
+        Args:
+            side (int): Index of the player to move
+
+        Returns:
+            List[Move]: Possible pushes
+        """
+        ejections = []
+        pushes = []
+        for direction, own_count, opp_count, ejecting, pushing in self.iter_push_sources(side):
+            tag = encode_move(0, direction, own_count, opp_count, False)
+            for moves, fields, sources in (
+                (ejections, tag | MOVE_EJECTED, ejecting),
+                (pushes, tag, pushing),
+            ):
+                while sources:
+                    low = sources & -sources
+                    moves.append(low.bit_length() - 1 | fields)
+                    sources ^= low
+        return ejections + pushes
+
+    def generate_tactical_moves(self, side: int) -> List[Move]:
+        """
+        Generates the moves of a player that eject a piece of the opponent, then the pushes leaving
+        a piece of the opponent on the edge of the board, which threaten to eject it at the next move.
+
+        Args:
+            side (int): Index of the player to move
+
+        Returns:
+            List[Move]: Ejections and threatening pushes
+        """
+        ejections = []
+        threats = []
+        for direction, own_count, opp_count, ejecting, pushing in self.iter_push_sources(side):
+            # lines whose last pushed piece lands on the edge
+            edge = EDGE_MASKS[direction]
+            for _ in range(own_count + opp_count):
+                edge = shift_back(edge, SHIFTS[direction])
+            tag = encode_move(0, direction, own_count, opp_count, False)
+            for moves, fields, sources in (
+                (ejections, tag | MOVE_EJECTED, ejecting),
+                (threats, tag, pushing & edge),
+            ):
+                while sources:
+                    low = sources & -sources
+                    moves.append(low.bit_length() - 1 | fields)
+                    sources ^= low
+        return ejections + threats
+
+    def count_pushes(self, side: int) -> Tuple[int, int]:
+        """
+        Counts the pushes available to a player without generating them.
+
+        Args:
+            side (int): Index of the player
+
+        Returns:
+            Tuple[int, int]: Number of pushes keeping all the pieces on the board, and number of ejections
+        """
+        pushes = 0
+        ejections = 0
+        for _, _, _, ejecting, pushing in self.iter_push_sources(side):
+            pushes += pushing.bit_count()
+            ejections += ejecting.bit_count()
+        return pushes, ejections
+
+    def generate_quiet_moves(self, side: int) -> List[Move]:
+        """
+        Generates the moves of a player that don't push any piece with whole-board shifts and masks.
+        The moves that throw one of the player's own pieces off the board come last.
+
+        Args:
+            side (int): Index of the player to move
+
+        Returns:
+            List[Move]: Possible moves without push
+        """
+        own = self.masks[side]
+        empty = VALID_MASK & ~(own | self.masks[1 - side])
+        moves = []
+        suicides = []
+        for direction, shift in enumerate(SHIFTS):
+            edge = EDGE_MASKS[direction]
+            own_1 = shift_back(own, shift)
+            own_2 = shift_back(own_1, shift)
+            empty_1 = shift_back(empty, shift)
+            empty_2 = shift_back(empty_1, shift)
+            empty_3 = shift_back(empty_2, shift)
+            edge_1 = shift_back(edge, shift)
+            edge_2 = shift_back(edge_1, shift)
+
+            # lines of 1, 2 and 3 own pieces
+            line_1 = own
+            line_2 = line_1 & own_1
+            line_3 = line_2 & own_2
+
+            for own_count, line, free, edge in (
+                (1, line_1, empty_1, edge),
+                (2, line_2, empty_2, edge_1),
+                (3, line_3, empty_3, edge_2),
+            ):
+                tag = encode_move(0, direction, own_count, 0, False)
+                for moves_list, fields, sources in (
+                    (moves, tag, line & free),
+                    (suicides, tag | MOVE_EJECTED, line & edge),
+                ):
+                    while sources:
+                        low = sources & -sources
+                        moves_list.append(low.bit_length() - 1 | fields)
+                        sources ^= low
+        return moves + suicides
+
+    def generate_moves(self, side: int) -> List[Move]:
+        """
+        Generates the moves of a player.
+        The moves are the same as the ones of GameStateAbalone.generator,
+        including the moves that throw one of the player's own pieces off the board.
+
+        Args:
+            side (int): Index of the player to move
+
+        Returns:
+            List[Move]: Possible moves
+        """
+        return self.generate_pushes(side) + self.generate_quiet_moves(side)
+
+    def is_legal_move(self, move: Move, side: int) -> bool:
+        """
+        Checks if a move, typically found in the transposition table, can be played on this board.
+
+        Args:
+            move (Move): The move
+            side (int): Index of the player to move
+
+        Returns:
+            bool: Whether the move is legal
+        """
+        source, direction, own_count, opp_count, ejected = decode_move(move)
+        line = (source,) + RAYS[source][direction]
+        length = own_count + opp_count
+        # the line reaches the edge of the board exactly when the move ejects a piece
+        if len(line) < length or (len(line) == length) != ejected:
+            return False
+        own = self.masks[side]
+        opp = self.masks[1 - side]
+        if not all(own >> cell & 1 for cell in line[:own_count]):
+            return False
+        if not all(opp >> cell & 1 for cell in line[own_count:length]):
+            return False
+        return ejected or not (own | opp) >> line[length] & 1
+
+    def apply_move(self, move: Move, side: int) -> Optional[int]:
+        """
+        Plays a move in place.
+
+        Args:
+            move (Move): The move to play
+            side (int): Index of the player playing the move
+
+        Returns:
+            Optional[int]: Index of the player whose piece was thrown off the board, if any
+        """
+        source = move & MOVE_SOURCE_MASK
+        shift = SHIFTS[move >> MOVE_DIRECTION_SHIFT & 7]
+        own_count = move >> MOVE_OWN_SHIFT & 3
+        opp_count = move >> MOVE_OPP_SHIFT & 3
+        ejected = move & MOVE_EJECTED
+        masks = self.masks
+        keys = ZOBRIST_KEYS[side]
+        # Only the pieces at both ends of a line change: the tail leaves, the head arrives
+        front = source + own_count * shift
+        if opp_count:
+            masks[side] ^= (1 << source) | (1 << front)
+            self.hash ^= keys[source] ^ keys[front]
+            keys = ZOBRIST_KEYS[1 - side]
+            if ejected:
+                masks[1 - side] ^= 1 << front
+                self.hash ^= keys[front]
+                return 1 - side
+            end = front + opp_count * shift
+            masks[1 - side] ^= (1 << front) | (1 << end)
+            self.hash ^= keys[front] ^ keys[end]
+            return None
+        if ejected:
+            masks[side] ^= 1 << source
+            self.hash ^= keys[source]
+            return side
+        masks[side] ^= (1 << source) | (1 << front)
+        self.hash ^= keys[source] ^ keys[front]
+        return None
+
+    def undo_move(self, move: Move, side: int) -> Optional[int]:
+        """
+        Reverts a move played with apply_move, the bit toggles being their own inverse.
+
+        Args:
+            move (Move): The move to revert
+            side (int): Index of the player who played the move
+
+        Returns:
+            Optional[int]: Index of the player whose piece comes back on the board, if any
+        """
+        return self.apply_move(move, side)
+
+    def move_to_light_action(self, move: Move) -> Dict[str, Tuple[int, int]]:
+        """
+        Converts a move to the light action format of GameStateAbalone.convert_light_action_to_action.
+
+        Args:
+            move (Move): The move
+
+        Returns:
+            Dict[str, Tuple[int, int]]: the "from" and "to" env coordinates of the move
+        """
+        i, j = bit_to_env(move & MOVE_SOURCE_MASK)
+        n_i, n_j = DIRECTIONS[move >> MOVE_DIRECTION_SHIFT & 7]
+        return {"from": (i, j), "to": (i + n_i, j + n_j)}
+
+    def find_move(self, masks: List[int], side: int) -> Optional[Move]:
+        """
+        Finds the move of a player leading from this board to the given pieces.
+
+        Args:
+            masks (List[int]): Pieces of each player after the move
+            side (int): Index of the player who played the move
+
+        Returns:
+            Optional[Move]: The first move generated leading to these pieces, None if there is none
+        """
+        for move in self.generate_moves(side):
+            self.apply_move(move, side)
+            found = self.masks == masks
+            self.undo_move(move, side)
+            if found:
+                return move
+        return None
+
+    def __str__(self) -> str:
+        return str(self.to_board())
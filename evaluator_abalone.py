@@ -0,0 +1,86 @@
+from typing import List
+
+from bitboard_abalone import BitBoardAbalone
+from geometry_abalone import DISTANCES_TO_CENTER, NEIGHBOUR_MASKS
+
+
+class IncrementalEvaluator:
+    """
+    Running sums of the features of the pieces of each player used by the heuristics.
+    They are updated with the few cells changed by a move instead of scanning the whole board at each leaf.
+
+    Attributes:
+        distances (List[float]): Sum of the distances to center of the pieces of each player.
+        counts (List[int]): Number of pieces of each player.
+        neighbours (List[int]): Number of (piece, direction) pairs with a friendly neighbour, per player.
+    """
+
+    def __init__(self, board: BitBoardAbalone) -> None:
+        self.reset(board)
+
+    def reset(self, board: BitBoardAbalone) -> None:
+        """
+        Computes the features of a board from scratch.
+
+        Args:
+            board (BitBoardAbalone): The board
+        """
+        self.distances = [0.0, 0.0]
+        self.counts = [0, 0]
+        self.neighbours = [0, 0]
+        for side, mask in enumerate(board.masks):
+            self.update(side, 0, mask)
+
+    def copy(self) -> "IncrementalEvaluator":
+        evaluator = IncrementalEvaluator.__new__(IncrementalEvaluator)
+        evaluator.distances = list(self.distances)
+        evaluator.counts = list(self.counts)
+        evaluator.neighbours = list(self.neighbours)
+        return evaluator
+
+    def update(self, side: int, before: int, after: int) -> None:
+        """
+        Updates the features of a player whose pieces changed, in O(number of changed cells).
+        Applying a move and undoing it are both a single update.
+
+        Args:
+            side (int): Index of the player
+            before (int): Pieces of the player before the change
+            after (int): Pieces of the player after the change
+        """
+        changed = before ^ after
+        mask = before
+        while changed:
+            low = changed & -changed
+            bit = low.bit_length() - 1
+            mask ^= low
+            if mask & low:
+                self.distances[side] += DISTANCES_TO_CENTER[bit]
+                self.counts[side] += 1
+                # the piece has its neighbours as neighbours, and is theirs
+                self.neighbours[side] += 2 * (NEIGHBOUR_MASKS[bit] & mask).bit_count()
+            else:
+                self.distances[side] -= DISTANCES_TO_CENTER[bit]
+                self.counts[side] -= 1
+                self.neighbours[side] -= 2 * (NEIGHBOUR_MASKS[bit] & mask).bit_count()
+            changed ^= low
+
+    def normalized_distances(self) -> List[float]:
+        """
+        Gives the distance to center of each player,
+        normalized to be lower than 1 so that score remains more important.
+
+        Returns:
+            List[float]: Normalized distance to center of each player
+        """
+        # divide distance by 5 as the max distance is 4
+        return [distance / 5 / (count or 1) for distance, count in zip(self.distances, self.counts)]
+
+    def adjacency(self) -> List[float]:
+        """
+        Gives the adjacency between marbles of each player.
+
+        Returns:
+            List[float]: Normalized adjacency of each player
+        """
+        return [neighbours / (6 * (count or 1)) for neighbours, count in zip(self.neighbours, self.counts)]
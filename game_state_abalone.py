@@ -4,6 +4,7 @@ from typing import Dict, List, Optional, Set, Tuple
 
 from board_abalone import BoardAbalone
 from player_abalone import PlayerAbalone
+from search_state_abalone import SearchStateAbalone
 from seahorse.game.action import Action
 from seahorse.game.game_layout.board import Piece
 from seahorse.game.game_state import GameState
@@ -196,6 +197,16 @@ players (list[Player]): List of players.
         }
         return poss_actions
 
+    def get_search_state(self) -> SearchStateAbalone:
+        """
+        Build a mutable copy of the game state for in-place search,
+        where moves are played with apply(move) and taken back with undo(move).
+
+        Returns:
+            SearchStateAbalone: The equivalent search state.
+        """
+        return SearchStateAbalone.from_game_state(self)
+
     def convert_light_action_to_action(self, data) -> Action:
         src, dst = data["from"], data["to"]
         current_game_state = self
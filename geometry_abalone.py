@@ -0,0 +1,145 @@
+from typing import Dict, List, Optional, Tuple
+
+from board_abalone import BoardAbalone
+
+# ---------------------------- Layout ----------------------------#
+
+# The 61 cells of the hexagon are laid out on an 11x11 axial grid surrounded by
+# a padding ring, so that a one-step shift of a valid cell never wraps onto
+# another valid cell: it either lands on a valid cell or falls off the board.
+ROW_WIDTH = 11
+ENV_DIMENSIONS = [17, 9]
+
+# Directions as (row, column) deltas in the env coordinates of BoardAbalone,
+# in the same order as GameStateAbalone.generator
+DIRECTIONS = [(-1, -1), (1, -1), (-1, 1), (1, 1), (2, 0), (-2, 0)]
+
+
+def env_to_bit(i: int, j: int) -> int:
+    """
+    Converts env coordinates of BoardAbalone to a bit position.
+
+    Args:
+        i (int): line indice
+        j (int): column indice
+
+    Returns:
+        int: bit position of the cell
+    """
+    return ((i - j) // 2 + 3) * ROW_WIDTH + j + 1
+
+
+def bit_to_env(bit: int) -> Tuple[int, int]:
+    """
+    Converts a bit position to env coordinates of BoardAbalone.
+
+    Args:
+        bit (int): bit position of the cell
+
+    Returns:
+        Tuple[int, int]: line and column indices of the cell
+    """
+    j = bit % ROW_WIDTH - 1
+    return 2 * (bit // ROW_WIDTH - 3) + j, j
+
+
+# Bit positions of the valid cells
+CELLS = sorted(
+    env_to_bit(i, j)
+    for i in range(ENV_DIMENSIONS[0])
+    for j in range(ENV_DIMENSIONS[1])
+    if not BoardAbalone.FORBIDDEN_MASK[i][j]
+)
+VALID_MASK = sum(1 << bit for bit in CELLS)
+
+# Bit offset of a one-step move in each direction
+SHIFTS = [n_j + (n_i - n_j) // 2 * ROW_WIDTH for n_i, n_j in DIRECTIONS]
+
+
+def shift_back(mask: int, shift: int) -> int:
+    """
+    Moves every bit of the mask one step against the direction of the shift,
+    so that the result holds the cells whose neighbour (along the shift) is in the mask.
+
+    Args:
+        mask (int): set of cells
+        shift (int): bit offset of the direction
+
+    Returns:
+        int: set of cells whose neighbour is in the mask
+    """
+    return mask >> shift if shift > 0 else mask << -shift
+
+
+# Cells whose neighbour in each direction is outside of the board
+EDGE_MASKS = [VALID_MASK & ~shift_back(VALID_MASK, shift) for shift in SHIFTS]
+
+# ---------------------------- Cell tables ----------------------------#
+
+# Tables indexed by bit position, entries of the bits outside of the board are left empty
+TABLE_SIZE = max(CELLS) + 1
+CENTER_BIT = env_to_bit(ENV_DIMENSIONS[0] // 2, ENV_DIMENSIONS[1] // 2)
+
+
+def compute_distance(bit: int, other: int) -> int:
+    """
+    Computes the number of steps between two cells of the hexagon.
+
+    Args:
+        bit (int): bit position of the first cell
+        other (int): bit position of the second cell
+
+    Returns:
+        int: distance between the cells
+    """
+    # on the axial grid, the rows and columns are two of the three hexagonal axes
+    rows = bit // ROW_WIDTH - other // ROW_WIDTH
+    columns = bit % ROW_WIDTH - other % ROW_WIDTH
+    return max(abs(rows), abs(columns), abs(rows + columns))
+
+
+# Distance to the center of the board of each cell
+DISTANCES_TO_CENTER = [
+    compute_distance(bit, CENTER_BIT) if VALID_MASK >> bit & 1 else 0 for bit in range(TABLE_SIZE)
+]
+
+# Neighbour of each cell in each direction, None if outside of the board
+NEIGHBOURS: List[List[Optional[int]]] = [
+    [bit + shift if VALID_MASK >> bit & 1 and VALID_MASK >> (bit + shift) & 1 else None for shift in SHIFTS]
+    for bit in range(TABLE_SIZE)
+]
+
+# Neighbours of each cell, as a mask
+NEIGHBOUR_MASKS = [
+    sum(1 << neighbour for neighbour in neighbours if neighbour is not None) for neighbours in NEIGHBOURS
+]
+
+
+def compute_ray(bit: int, direction: int) -> Tuple[int, ...]:
+    """
+    Lists the cells met from a cell in a direction until the edge of the board.
+
+    Args:
+        bit (int): bit position of the cell
+        direction (int): index of the direction in DIRECTIONS
+
+    Returns:
+        Tuple[int, ...]: bit positions of the cells, the starting cell excluded
+    """
+    ray = []
+    neighbour = NEIGHBOURS[bit][direction]
+    while neighbour is not None:
+        ray.append(neighbour)
+        neighbour = NEIGHBOURS[neighbour][direction]
+    return tuple(ray)
+
+
+# Cells met from each cell in each direction until the edge of the board
+RAYS = [[compute_ray(bit, direction) for direction in range(len(DIRECTIONS))] for bit in range(TABLE_SIZE)]
+
+# Same tables for the env coordinates of BoardAbalone
+ENV_DISTANCES_TO_CENTER: Dict[Tuple[int, int], int] = {bit_to_env(bit): DISTANCES_TO_CENTER[bit] for bit in CELLS}
+ENV_NEIGHBOURS: Dict[Tuple[int, int], List[Tuple[int, int]]] = {
+    bit_to_env(bit): [bit_to_env(neighbour) for neighbour in NEIGHBOURS[bit] if neighbour is not None]
+    for bit in CELLS
+}
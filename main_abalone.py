@@ -18,76 +18,79 @@ from seahorse.utils.custom_exceptions import PlayerDuplicateError
 from argparse import RawTextHelpFormatter
 
 
-def play(player1, player2, log_level, port, address, gui, record, gui_path, config):
+# 0 case non accessible
+# 1 case player 1
+# 2 case player 2
+# 3 case vide accessible
+CLASSIC = [  # CLASSIQUE
+    [0, 0, 0, 0, 1, 0, 0, 0, 0],
+    [0, 0, 0, 1, 0, 1, 0, 0, 0],
+    [0, 0, 1, 0, 1, 0, 3, 0, 0],
+    [0, 1, 0, 1, 0, 3, 0, 3, 0],
+    [1, 0, 1, 0, 1, 0, 3, 0, 3],
+    [0, 1, 0, 1, 0, 3, 0, 3, 0],
+    [1, 0, 1, 0, 3, 0, 3, 0, 3],
+    [0, 3, 0, 3, 0, 3, 0, 3, 0],
+    [3, 0, 3, 0, 3, 0, 3, 0, 3],
+    [0, 3, 0, 3, 0, 3, 0, 3, 0],
+    [3, 0, 3, 0, 3, 0, 2, 0, 2],
+    [0, 3, 0, 3, 0, 2, 0, 2, 0],
+    [3, 0, 3, 0, 2, 0, 2, 0, 2],
+    [0, 3, 0, 3, 0, 2, 0, 2, 0],
+    [0, 0, 3, 0, 2, 0, 2, 0, 0],
+    [0, 0, 0, 2, 0, 2, 0, 0, 0],
+    [0, 0, 0, 0, 2, 0, 0, 0, 0],
+]
+
+ALIEN = [  # ALIEN
+    [0, 0, 0, 0, 2, 0, 0, 0, 0],
+    [0, 0, 0, 3, 0, 3, 0, 0, 0],
+    [0, 0, 2, 0, 2, 0, 3, 0, 0],
+    [0, 3, 0, 1, 0, 2, 0, 3, 0],
+    [2, 0, 1, 0, 1, 0, 3, 0, 3],
+    [0, 2, 0, 2, 0, 3, 0, 3, 0],
+    [3, 0, 1, 0, 2, 0, 3, 0, 3],
+    [0, 2, 0, 2, 0, 3, 0, 3, 0],
+    [3, 0, 3, 0, 3, 0, 3, 0, 3],
+    [0, 3, 0, 3, 0, 1, 0, 1, 0],
+    [3, 0, 3, 0, 1, 0, 2, 0, 3],
+    [0, 3, 0, 3, 0, 1, 0, 1, 0],
+    [3, 0, 3, 0, 2, 0, 2, 0, 1],
+    [0, 3, 0, 1, 0, 2, 0, 3, 0],
+    [0, 0, 3, 0, 1, 0, 1, 0, 0],
+    [0, 0, 0, 3, 0, 3, 0, 0, 0],
+    [0, 0, 0, 0, 1, 0, 0, 0, 0],
+]
+
+SIMPLIFIED = [  # SIMPLIFIED
+    [0, 0, 0, 0, 3, 0, 0, 0, 0],
+    [0, 0, 0, 3, 0, 3, 0, 0, 0],
+    [0, 0, 3, 0, 3, 0, 3, 0, 0],
+    [0, 3, 0, 3, 0, 3, 0, 3, 0],
+    [3, 0, 3, 0, 3, 0, 3, 0, 3],
+    [0, 1, 0, 1, 0, 3, 0, 3, 0],
+    [3, 0, 1, 0, 3, 0, 3, 0, 3],
+    [0, 3, 0, 3, 0, 3, 0, 3, 0],
+    [3, 0, 3, 0, 3, 0, 3, 0, 3],
+    [0, 3, 0, 3, 0, 3, 0, 3, 0],
+    [3, 0, 3, 0, 3, 0, 2, 0, 3],
+    [0, 3, 0, 3, 0, 2, 0, 2, 0],
+    [3, 0, 3, 0, 3, 0, 3, 0, 3],
+    [0, 3, 0, 3, 0, 3, 0, 3, 0],
+    [0, 0, 3, 0, 3, 0, 3, 0, 0],
+    [0, 0, 0, 3, 0, 3, 0, 0, 0],
+    [0, 0, 0, 0, 3, 0, 0, 0, 0],
+]
+
+LAYOUTS = {"classic": CLASSIC, "alien": ALIEN, "simplified": SIMPLIFIED}
+
+
+def create_initial_game_state(player1, player2, config):
     list_players = [player1, player2]
     init_scores = {player1.get_id(): 0, player2.get_id(): 0}
     dim = [17, 9]
     env = {}
-    # 0 case non accessible
-    # 1 case player 1
-    # 2 case player 2
-    # 3 case vide accessible
-    classic = [  # CLASSIQUE
-        [0, 0, 0, 0, 1, 0, 0, 0, 0],
-        [0, 0, 0, 1, 0, 1, 0, 0, 0],
-        [0, 0, 1, 0, 1, 0, 3, 0, 0],
-        [0, 1, 0, 1, 0, 3, 0, 3, 0],
-        [1, 0, 1, 0, 1, 0, 3, 0, 3],
-        [0, 1, 0, 1, 0, 3, 0, 3, 0],
-        [1, 0, 1, 0, 3, 0, 3, 0, 3],
-        [0, 3, 0, 3, 0, 3, 0, 3, 0],
-        [3, 0, 3, 0, 3, 0, 3, 0, 3],
-        [0, 3, 0, 3, 0, 3, 0, 3, 0],
-        [3, 0, 3, 0, 3, 0, 2, 0, 2],
-        [0, 3, 0, 3, 0, 2, 0, 2, 0],
-        [3, 0, 3, 0, 2, 0, 2, 0, 2],
-        [0, 3, 0, 3, 0, 2, 0, 2, 0],
-        [0, 0, 3, 0, 2, 0, 2, 0, 0],
-        [0, 0, 0, 2, 0, 2, 0, 0, 0],
-        [0, 0, 0, 0, 2, 0, 0, 0, 0],
-    ]
-    alien = [  # ALIEN
-            [0, 0, 0, 0, 2, 0, 0, 0, 0],
-            [0, 0, 0, 3, 0, 3, 0, 0, 0],
-            [0, 0, 2, 0, 2, 0, 3, 0, 0],
-            [0, 3, 0, 1, 0, 2, 0, 3, 0],
-            [2, 0, 1, 0, 1, 0, 3, 0, 3],
-            [0, 2, 0, 2, 0, 3, 0, 3, 0],
-            [3, 0, 1, 0, 2, 0, 3, 0, 3],
-            [0, 2, 0, 2, 0, 3, 0, 3, 0],
-            [3, 0, 3, 0, 3, 0, 3, 0, 3],
-            [0, 3, 0, 3, 0, 1, 0, 1, 0],
-            [3, 0, 3, 0, 1, 0, 2, 0, 3],
-            [0, 3, 0, 3, 0, 1, 0, 1, 0],
-            [3, 0, 3, 0, 2, 0, 2, 0, 1],
-            [0, 3, 0, 1, 0, 2, 0, 3, 0],
-            [0, 0, 3, 0, 1, 0, 1, 0, 0],
-            [0, 0, 0, 3, 0, 3, 0, 0, 0],
-            [0, 0, 0, 0, 1, 0, 0, 0, 0],
-    ]
-
-    simplified = [  # SIMPLIFIED
-        [0, 0, 0, 0, 3, 0, 0, 0, 0],
-        [0, 0, 0, 3, 0, 3, 0, 0, 0],
-        [0, 0, 3, 0, 3, 0, 3, 0, 0],
-        [0, 3, 0, 3, 0, 3, 0, 3, 0],
-        [3, 0, 3, 0, 3, 0, 3, 0, 3],
-        [0, 1, 0, 1, 0, 3, 0, 3, 0],
-        [3, 0, 1, 0, 3, 0, 3, 0, 3],
-        [0, 3, 0, 3, 0, 3, 0, 3, 0],
-        [3, 0, 3, 0, 3, 0, 3, 0, 3],
-        [0, 3, 0, 3, 0, 3, 0, 3, 0],
-        [3, 0, 3, 0, 3, 0, 2, 0, 3],
-        [0, 3, 0, 3, 0, 2, 0, 2, 0],
-        [3, 0, 3, 0, 3, 0, 3, 0, 3],
-        [0, 3, 0, 3, 0, 3, 0, 3, 0],
-        [0, 0, 3, 0, 3, 0, 3, 0, 0],
-        [0, 0, 0, 3, 0, 3, 0, 0, 0],
-        [0, 0, 0, 0, 3, 0, 0, 0, 0],
-    ]
-
-    initial_board = classic if config == 'classic' else (
-        alien if config == 'alien' else simplified)
+    initial_board = LAYOUTS.get(config, SIMPLIFIED)
     W = 1
     B = 2
     for i in range(dim[0]):
@@ -100,8 +103,13 @@ def play(player1, player2, log_level, port, address, gui, record, gui_path, conf
                     piece_type=player2.get_piece_type(), owner=player2)
 
     init_rep = BoardAbalone(env=env, dim=dim)
-    initial_game_state = GameStateAbalone(
+    return GameStateAbalone(
         scores=init_scores, next_player=player1, players=list_players, rep=init_rep, step=0)
+
+
+def play(player1, player2, log_level, port, address, gui, record, gui_path, config):
+    list_players = [player1, player2]
+    initial_game_state = create_initial_game_state(player1, player2, config)
     try:
         master = MasterAbalone(
             name="Abalone", initial_game_state=initial_game_state, players_iterator=list_players, log_level=log_level, port=port,
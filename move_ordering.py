@@ -0,0 +1,161 @@
+from typing import Dict, Iterator, List, Optional
+
+from bitboard_abalone import MOVE_EJECTED, MOVE_OPP_MASK, MOVE_OPP_SHIFT, MOVE_PATH_MASK, Move
+from search_state_abalone import SearchStateAbalone
+
+# Ordering scores of the move categories, from the first searched to the last
+TT_MOVE_SCORE = 1 << 40
+EJECTION_SCORE = 1 << 36
+PUSH_SCORE = 1 << 32
+KILLER_SCORE = 1 << 28
+SUICIDE_SCORE = -(1 << 40)
+
+# Number of killer moves kept per ply
+KILLER_SLOTS = 2
+
+
+def is_ejection(move: Move) -> bool:
+    """
+    Checks if a move throws a piece of the opponent off the board.
+
+    Args:
+        move (Move): The move
+
+    Returns:
+        bool: Whether the move ejects a piece of the opponent
+    """
+    return bool(move & MOVE_EJECTED and move & MOVE_OPP_MASK)
+
+
+def is_suicide(move: Move) -> bool:
+    """
+    Checks if a move throws a piece of the player off the board.
+
+    Args:
+        move (Move): The move
+
+    Returns:
+        bool: Whether the move ejects a piece of the player
+    """
+    return bool(move & MOVE_EJECTED and not move & MOVE_OPP_MASK)
+
+
+class MoveOrderer:
+    """
+    Cheap move ordering for alpha-beta search: the move of the transposition table first,
+    then ejections, pushes, killer moves and the other moves by history score.
+    Moves throwing one of the player's own pieces off the board come last.
+
+    Attributes:
+        killers (Dict[int, List[Move]]): Last quiet moves that caused a cutoff, per step of the game.
+        history (List[List[int]]): Cutoff score of each (source, direction) quiet move, per player,
+            indexed by move & MOVE_PATH_MASK.
+    """
+
+    def __init__(self) -> None:
+        self.killers: Dict[int, List[Move]] = {}
+        self.history = [[0] * (MOVE_PATH_MASK + 1) for _ in range(2)]
+
+    def new_search(self) -> None:
+        """
+        Forgets the killer moves and ages the history scores before a new search.
+        """
+        self.killers = {}
+        for history in self.history:
+            for index, value in enumerate(history):
+                if value:
+                    history[index] = value >> 1
+
+    def score_move(self, move: Move, side: int, killers: List[Move], tt_move: Optional[Move]) -> int:
+        """
+        Gives the ordering score of a move, higher scores are searched first.
+
+        Args:
+            move (Move): The move
+            side (int): Index of the player to move
+            killers (List[Move]): Killer moves of the current ply
+            tt_move (Optional[Move]): Best move stored in the transposition table
+
+        Returns:
+            int: Ordering score
+        """
+        if move == tt_move:
+            return TT_MOVE_SCORE
+        if move & MOVE_OPP_MASK:
+            opp_count = move >> MOVE_OPP_SHIFT & 3
+            if is_ejection(move):
+                return EJECTION_SCORE + opp_count
+            # pushing two pieces gains more ground than pushing one
+            return PUSH_SCORE + opp_count
+        if is_suicide(move):
+            return SUICIDE_SCORE
+        if move in killers:
+            return KILLER_SCORE - killers.index(move)
+        return self.history[side][move & MOVE_PATH_MASK]
+
+    def order_moves(self, moves: List[Move], side: int, step: int, tt_move: Optional[Move] = None) -> List[Move]:
+        """
+        Sorts moves from the most to the least promising.
+
+        Args:
+            moves (List[Move]): Moves to sort
+            side (int): Index of the player to move
+            step (int): Step of the game of the current node, used as ply index of the killer moves
+            tt_move (Optional[Move]): Best move stored in the transposition table
+
+        Returns:
+            List[Move]: Sorted moves
+        """
+        killers = self.killers.get(step, ())
+        return sorted(moves, key=lambda move: self.score_move(move, side, killers, tt_move), reverse=True)
+
+    def iter_moves(self, state: SearchStateAbalone, tt_move: Optional[Move] = None) -> Iterator[Move]:
+        """
+        Yields the moves of a state lazily, in stages: the move of the transposition table,
+        then ejections and pushes in generation order, then the other moves sorted by killer and history scores.
+        A stage is only generated when the search reaches it, so a cutoff on an early move
+        saves the generation and the sorting of the quiet moves.
+
+        Args:
+            state (SearchStateAbalone): State to generate the moves of
+            tt_move (Optional[Move]): Best move stored in the transposition table
+
+        Yields:
+            Move: Moves from the most to the least promising
+        """
+        side = state.next_side
+        board = state.board
+        if tt_move is not None and board.is_legal_move(tt_move, side):
+            yield tt_move
+        else:
+            tt_move = None
+        for move in board.generate_pushes(side):
+            if move != tt_move:
+                yield move
+        killers = self.killers.get(state.step, ())
+        for move in sorted(
+            board.generate_quiet_moves(side),
+            key=lambda move: self.score_move(move, side, killers, tt_move),
+            reverse=True,
+        ):
+            if move != tt_move:
+                yield move
+
+    def record_cutoff(self, move: Move, side: int, step: int, depth: int) -> None:
+        """
+        Updates the killer moves and history scores after a beta cutoff.
+
+        Args:
+            move (Move): Move that caused the cutoff
+            side (int): Index of the player who played the move
+            step (int): Step of the game of the node
+            depth (int): Remaining depth of the node
+        """
+        if move & MOVE_OPP_MASK:
+            # pushes are already searched early
+            return
+        killers = self.killers.setdefault(step, [])
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[KILLER_SLOTS:]
+        self.history[side][move & MOVE_PATH_MASK] += depth * depth
@@ -1,151 +1,110 @@
 # Axel BAUDOT (2297081)
 # Thomas PERRIN (2229377)
 
+from bitboard_abalone import MOVE_OPP_MASK, ZOBRIST_ENDGAME_KEY, Move, move_to_str
+from geometry_abalone import DISTANCES_TO_CENTER, SHIFTS, shift_back
+from move_ordering import MoveOrderer
 from player_abalone import PlayerAbalone
+from search_profiler import SearchProfiler
+from search_state_abalone import SearchStateAbalone
+from search_stats import SearchStats
+from time_manager_abalone import TimeManagerAbalone
+from transposition_table import EXACT, LOWER_BOUND, UPPER_BOUND, SharedTranspositionTable, TranspositionTable
 from seahorse.game.action import Action
 from seahorse.game.game_state import GameState
+from concurrent.futures import ProcessPoolExecutor, wait
 from math import inf
-from statistics import fmean
-from typing import Dict, List, Tuple
+from time import perf_counter
+from typing import List, Optional, Tuple
+import multiprocessing
 
 
-# ---------------------------- Constants for dict keys ----------------------------#
-
-# Constants for game tree dict keys
-DEPTH = "depth"
-SCORE = "score"
-PLAYER = "player"
-
 # ---------------------------- Utils ----------------------------#
 
 
-def manhattanDist(A, B):
-    mask1 = [(0, 2), (1, 3), (2, 4)]
-    mask2 = [(0, 4)]
-    diff = (abs(B[0] - A[0]), abs(B[1] - A[1]))
-    dist = (abs(B[0] - A[0]) + abs(B[1] - A[1])) / 2
-    if diff in mask1:
-        dist += 1
-    if diff in mask2:
-        dist += 2
-    return dist
-
-
-# ---------------------------- Heuristics ----------------------------#
-
-
-def get_opponent(state: GameState, player: PlayerAbalone) -> PlayerAbalone:
+def iter_bits(mask: int):
     """
-    Returns the opponent of the player supplied as argument.
+    Iterates over the bit positions set in a mask.
+
     Args:
-        state (GameState): Current game state representation
-        player (PlayerAbalone): The player
+        mask (int): set of cells of the bitboard
 
-    Returns:
-        PlayerAbalone: The opponent of the player
+    Yields:
+        int: bit position of each cell
     """
-    players = state.get_players()
-    opponent = players[1] if players[0] == player else players[0]
-    return opponent
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+# ---------------------------- Heuristics ----------------------------#
 
 
 # Distance to center heuristic
 
 
-def compute_normalized_distances_to_center(state: GameState) -> Dict[int, float]:
+def compute_normalized_distances_to_center(state: SearchStateAbalone) -> List[float]:
     """
     Computes the distance to center for each player,
     normalized to be lower than 1 so that score remains more important.
 
     Args:
-        state (GameState): Current game state representation
+        state (SearchStateAbalone): Current game state representation
 
     Returns:
-        Dict[int, float]: Dictionary with player_id as key and normalized distance to center as value
-    """
-    players_id = [player.get_id() for player in state.get_players()]
-    final_rep = state.get_rep()
-    env = final_rep.get_env()
-    dim = final_rep.get_dimensions()
-    dist = dict.fromkeys(players_id, 0)
-    pieces = dict.fromkeys(players_id, 0)
-    center = (dim[0] // 2, dim[1] // 2)
-    for i, j in list(env.keys()):
-        p = env.get((i, j), None)
-        if p.get_owner_id():
-            # divide distance by 5 as the max distance is 4
-            dist[p.get_owner_id()] += manhattanDist(center, (i, j)) / 5
-            pieces[p.get_owner_id()] += 1
-    for player_id in players_id:
-        dist[player_id] /= pieces[player_id]
+        List[float]: Normalized distance to center of each player
+    """
+    dist = []
+    for mask in state.board.masks:
+        # divide distance by 5 as the max distance is 4
+        total = sum(DISTANCES_TO_CENTER[bit] for bit in iter_bits(mask)) / 5
+        dist.append(total / (mask.bit_count() or 1))
     return dist
 
 
 # Adjacency heuristic
 
 
-def get_adjacency(state: GameState, player: PlayerAbalone) -> float:
+def get_adjacency(mask: int) -> float:
     """
-    Computes the adjacency score for the given player.
+    Computes the adjacency score for the pieces of a player.
 
     Args:
-        state (GameState): Current game state representation
-        player (PlayerAbalone): The player
+        mask (int): Pieces of the player
 
     Returns:
         float: Normalized adjacency score
     """
-    pieces_pos = state.get_rep().get_pieces_player(player)[1]
-    neighbourhood_scores = [
-        len(
-            [
-                _
-                for _, neighbour in state.get_neighbours(piece[0], piece[1]).items()
-                if neighbour[0] == player.get_piece_type()
-            ]
-        )
-        for piece in pieces_pos
-    ]
-    adjacency_score = fmean(neighbourhood_scores) / 6
-    return adjacency_score
+    # each direction counts the pieces having a friendly neighbour on that side
+    neighbours = sum((mask & shift_back(mask, shift)).bit_count() for shift in SHIFTS)
+    return neighbours / (6 * (mask.bit_count() or 1))
 
 
-def compute_adjacency(state: GameState) -> Dict[int, float]:
+def compute_adjacency(state: SearchStateAbalone) -> List[float]:
     """
     Computes the adjacency between marbles for both players.
 
     Args:
-        state (GameState): Current game state representation
+        state (SearchStateAbalone): Current game state representation
 
     Returns:
-        Dict[int, float]: Dictionary with player_id as key and normalized adjacency as value
+        List[float]: Normalized adjacency of each player
     """
-    # Get players id
-    opponent = state.get_next_player()
-    opponent_id = opponent.get_id()
-    player = get_opponent(state, opponent)
-    player_id = player.get_id()
-
-    adjacency_scores = {
-        player_id: get_adjacency(state, player),
-        opponent_id: get_adjacency(state, opponent),
-    }
-    return adjacency_scores
+    return [get_adjacency(mask) for mask in state.board.masks]
 
 
 # Final combined heuristic (score, distance to center, adjacency)
 
 
-def combine_heuristics(
-    score: Dict[int, float], dist: Dict[int, float], adjacency: Dict[int, float]
-) -> float:
+def combine_heuristics(score: float, dist: float, adjacency: float) -> float:
     """
     Combines the different heuristics in a weighted manner.
 
     Args:
-        score (Dict[int, float]): Dictionary with player_id as key and score as value
-        dist (Dict[int, float]): Dictionary with player_id as key and normalized distance to center as value
-        adjacency (Dict[int, float]): Dictionary with player_id as key and normalized adjacency as value
+        score (float): Score of the player
+        dist (float): Normalized distance to center of the player
+        adjacency (float): Normalized adjacency of the player
 
     Returns:
         float: The combined heuristic
@@ -156,27 +115,30 @@ def combine_heuristics(
     return coeff_score * score - coeff_dist * dist + coeff_adjacency * adjacency
 
 
-def score_distance_adjacency_sym(state: GameState) -> float:
+def score_distance_adjacency_sym(state: SearchStateAbalone) -> float:
     """
     Combines score, distance to center and adjacency for a heuristic
     that would give the winner of the game.
 
     Args:
-        state (GameState): Current game state representation
+        state (SearchStateAbalone): Current game state representation
 
     Returns:
         float: Final heuristic
     """
     scores = state.scores
-    player = state.get_next_player()
-    opponent = get_opponent(state, player)
-    player_id = player.get_id()
-    opponent_id = opponent.get_id()
-    dist = compute_normalized_distances_to_center(state)
-    adjacency = compute_adjacency(state)
-    value = combine_heuristics(scores[player_id], dist[player_id], adjacency[player_id])
+    player = state.next_side
+    opponent = 1 - player
+    evaluator = state.evaluator
+    if evaluator is not None:
+        dist = evaluator.normalized_distances()
+        adjacency = evaluator.adjacency()
+    else:
+        dist = compute_normalized_distances_to_center(state)
+        adjacency = compute_adjacency(state)
+    value = combine_heuristics(scores[player], dist[player], adjacency[player])
     opponent_value = combine_heuristics(
-        scores[opponent_id], dist[opponent_id], adjacency[opponent_id]
+        scores[opponent], dist[opponent], adjacency[opponent]
     )
     result = value - opponent_value
     return result
@@ -185,203 +147,940 @@ def score_distance_adjacency_sym(state: GameState) -> float:
 # ---------------------------- Research Strategy ----------------------------#
 
 
-def compute_distances_to_center(state: GameState) -> Dict[int, float]:
+def compute_distances_to_center(state: SearchStateAbalone) -> List[float]:
     """
     Computes the distance to center for each player.
 
     Args:
-        state (GameState): Current game state representation
+        state (SearchStateAbalone): Current game state representation
 
     Returns:
-        Dict[int, float]: Dictionary with player_id as key and distance to center as value
-    """
-    players_id = [player.get_id() for player in state.get_players()]
-    final_rep = state.get_rep()
-    env = final_rep.get_env()
-    dim = final_rep.get_dimensions()
-    dist = dict.fromkeys(players_id, 0)
-    center = (dim[0] // 2, dim[1] // 2)
-    for i, j in list(env.keys()):
-        p = env.get((i, j), None)
-        if p.get_owner_id():
-            dist[p.get_owner_id()] += manhattanDist(center, (i, j))
-    return dist
+        List[float]: Distance to center of each player
+    """
+    return [
+        sum(DISTANCES_TO_CENTER[bit] for bit in iter_bits(mask))
+        for mask in state.board.masks
+    ]
 
 
-def compute_winner(state: GameState) -> List[PlayerAbalone]:
+def compute_winner(state: SearchStateAbalone) -> Optional[int]:
     """
-    Computes the winners of the game based on the scores.
+    Computes the winner of the game based on the scores.
 
     Args:
-        state (GameState): Current game state representation
+        state (SearchStateAbalone): Current game state representation
 
     Returns:
-        Iterable[PlayerAbalone]: List of the players who won the game
+        Optional[int]: Index of the player who won the game, None for a draw
     """
     scores = state.scores
-    max_val = max(scores.values())
-    players_id = list(filter(lambda key: scores[key] == max_val, scores))
-    itera = list(filter(lambda x: x.get_id() in players_id, state.get_players()))
-    if len(itera) > 1:  # égalité
-        dist = compute_distances_to_center(state)
-        min_dist = min(dist.values())
-        players_id = list(filter(lambda key: dist[key] == min_dist, dist))
-        itera = list(filter(lambda x: x.get_id() in players_id, state.get_players()))
-
-    if len(itera) > 1:
-        return None
+    if scores[0] != scores[1]:
+        return 0 if scores[0] > scores[1] else 1
+    # égalité
+    dist = compute_distances_to_center(state)
+    if dist[0] != dist[1]:
+        return 0 if dist[0] < dist[1] else 1
+    return None
 
-    if len(itera) == 1:
-        return itera[0]
 
-
-def compute_terminal_state_score(state: GameState) -> int:
+def compute_terminal_state_score(state: SearchStateAbalone) -> float:
     """
-    Computes the score of the state for the max_player.
+    Computes the score of the state for the next player.
 
     Args:
-        state (GameState): Current game state representation
+        state (SearchStateAbalone): Current game state representation
 
     Returns:
-        int: The score of the state for the max_player
+        float: The score of the state for the next player
     """
     winner = compute_winner(state)
     if winner is None:
         return 0
-    if winner.get_id() == state.get_next_player().get_id():
+    if winner == state.next_side:
         return inf
     else:
         return -inf
 
 
-def push_happened(state: GameState, previous_state: GameState) -> bool:
+def get_bound(score: float, alpha: float, beta: float) -> int:
     """
-    Checks if a push happened between the previous state and the current state.
+    Gives the bound type of a score returned by an alpha-beta search.
 
     Args:
-        state (GameState): Current game state representation
-        previous_state (GameState): Previous game state representation
+        score (float): Score returned by the search
+        alpha (float): Lower bound of the search window
+        beta (float): Upper bound of the search window
 
     Returns:
-        bool: Whether a push happened or not
+        int: UPPER_BOUND after a fail-low, LOWER_BOUND after a cutoff, EXACT otherwise
     """
-    player = state.get_next_player()
-    # Get the previous positions of the given player's pieces
-    prev_pos = previous_state.get_rep().get_pieces_player(player)[1]
-
-    # Differences in the positions of the given player's pieces
-    new_pos = state.get_rep().get_pieces_player(player)[1]
-    return not (set(new_pos) == set(prev_pos))
+    if score <= alpha:
+        return UPPER_BOUND
+    if score >= beta:
+        return LOWER_BOUND
+    return EXACT
 
 
-def lookup_score(state: GameState, depth: int, table: Dict) -> ((str, bool), float):
+def lookup_score(
+    state: SearchStateAbalone,
+    depth: int,
+    table: TranspositionTable,
+    alpha: float = -inf,
+    beta: float = inf,
+    stats: Optional[SearchStats] = None,
+) -> (int, Optional[float], float, float, Optional[Move]):
     """
     Looks up the score of the state in the transposition table.
+    Bounds found in the table narrow the alpha-beta window.
 
     Args:
-        state (GameState): Current game state representation
+        state (SearchStateAbalone): Current game state representation
         depth (int): Depth of the search
-        table (Dict): Transposition table
+        table (TranspositionTable): Transposition table
+        alpha (float): Lower bound of the search window
+        beta (float): Upper bound of the search window
+        stats (Optional[SearchStats]): Counters of the search
 
     Returns:
-        (srt, bool): key used for lookup (state representation, end of game is near)
-        float: score
-    """
-    endgame = state.step + depth > state.max_step
-    table_key = (str(state.rep), endgame)
-    lookup_result = table.get(table_key)
-    if lookup_result is not None and lookup_result[DEPTH] >= depth:
-        score = (
-            lookup_result[SCORE]
-            if lookup_result[PLAYER] == state.get_next_player()
-            else -lookup_result[SCORE]
-        )
-        return table_key, score
-    return table_key, None
+        int: key used for lookup (Zobrist hash of the state, flipped when the end of game is near)
+        Optional[float]: score, if the entry is exact or cuts off the window
+        float: narrowed alpha
+        float: narrowed beta
+        Optional[Move]: best move stored for the state, whatever the depth of the entry
+    """
+    table_key = state.hash
+    if state.step + depth > state.max_step:
+        table_key ^= ZOBRIST_ENDGAME_KEY
+    lookup_result = table.probe(table_key)
+    if stats is not None:
+        stats.tt_probes += 1
+        stats.tt_hits += lookup_result is not None
+    if lookup_result is None:
+        return table_key, None, alpha, beta, None
+    # the hash includes the next player, so the score is from its point of view
+    score, entry_depth, bound, tt_move = lookup_result
+    if entry_depth >= depth:
+        if bound == EXACT:
+            return table_key, score, alpha, beta, tt_move
+        if bound == LOWER_BOUND:
+            alpha = max(alpha, score)
+        else:
+            beta = min(beta, score)
+        if alpha >= beta:
+            return table_key, score, alpha, beta, tt_move
+    return table_key, None, alpha, beta, tt_move
+
+
+class SearchTimeout(Exception):
+    """
+    Raised when a search goes past its deadline or is stopped.
+    """
+
+
+# Width of the null windows of the principal variation search, smaller than any difference of heuristic values
+NULL_WINDOW = 1e-6
+
+# Search algorithms of compute_state_score
+ALPHA_BETA = "alphabeta"
+PVS = "pvs"
+
+# Late move reductions: depth removed from the quiet moves searched after the first LMR_MIN_INDEX moves
+# of the nodes at least LMR_MIN_DEPTH deep
+LMR_REDUCTION = 1
+LMR_MIN_INDEX = 3
+LMR_MIN_DEPTH = 3
+
+# Depth removed from the searches after a null move and from the verification searches
+NULL_MOVE_REDUCTION = 2
+
+# Widening factor of the aspiration window after a fail-low or a fail-high
+ASPIRATION_GROWTH = 4
+# Half width beyond which the aspiration window is opened completely, one marble is worth 10
+MAX_ASPIRATION_WINDOW = 20
+
+
+def is_critical(state: SearchStateAbalone, depth: int) -> bool:
+    """
+    Checks if selective search is unsafe in a state: when the end of the game is within the horizon,
+    as lookup_score also detects, or when a player is one ejection away from losing,
+    where passing or neglecting a quiet move can change the outcome (zugzwang-like positions).
+
+    Args:
+        state (SearchStateAbalone): Current game state representation
+        depth (int): Depth of the search from the state
+
+    Returns:
+        bool: Whether null moves and reductions must be avoided
+    """
+    return state.step + depth >= state.max_step or state.max_score + 1 in state.scores
+
+
+def search_child(
+    child_search: dict, alpha: float, beta: float, null_window: bool, reduce: bool = False
+) -> float:
+    """
+    Searches a child of a node with compute_state_score, the move leading to it being played on the state.
+
+    Args:
+        child_search (dict): Arguments of compute_state_score for the child, except the window
+        alpha (float): Lower bound of the window of the node
+        beta (float): Upper bound of the window of the node
+        null_window (bool): Whether to try a null window search first, for the moves after the first one of PVS
+        reduce (bool): Whether to try a search at reduced depth first, for the late quiet moves
+
+    Returns:
+        float: score of the child, for the player to move in the child
+    """
+    stats = child_search["stats"]
+    if reduce and -inf < alpha:
+        # a late quiet move is probably not better than the best one, check it cheaply
+        if stats is not None:
+            stats.reductions += 1
+        reduced_search = dict(child_search, depth=child_search["depth"] - LMR_REDUCTION)
+        child_score = compute_state_score(**reduced_search, alpha=-alpha - NULL_WINDOW, beta=-alpha)
+        if -child_score <= alpha:
+            return child_score
+        if stats is not None:
+            stats.reduction_re_searches += 1
+    if null_window and -inf < alpha and beta - alpha > NULL_WINDOW:
+        # only prove that the move isn't better than the best one found so far
+        child_score = compute_state_score(**child_search, alpha=-alpha - NULL_WINDOW, beta=-alpha)
+        if not alpha < -child_score < beta:
+            return child_score
+        # fail-high: search again with the full window for the exact score
+        if stats is not None:
+            stats.re_searches += 1
+    return compute_state_score(**child_search, alpha=-beta, beta=-alpha)
+
+
+def search_null_move(child_search: dict, beta: float) -> Optional[float]:
+    """
+    Null move pruning: lets the player to move pass and searches the state at reduced depth.
+    If the player still reaches beta without playing, the state is most likely good enough to cut off.
+    A verification search of the moves at reduced depth, without null moves, must reach beta too,
+    which protects against the positions where any move is worse than passing.
+
+    Args:
+        child_search (dict): Arguments of compute_state_score for the children of the state, except the window
+        beta (float): Upper bound of the window of the state
+
+    Returns:
+        Optional[float]: lower bound of the score of the state if it is cut off, None otherwise
+    """
+    state = child_search["state"]
+    depth = child_search["depth"] + 1
+    if beta == inf or depth <= NULL_MOVE_REDUCTION or is_critical(state, depth):
+        return None
+    if child_search["heuristic"](state) < beta:
+        return None
+    reduced_search = dict(child_search, depth=depth - 1 - NULL_MOVE_REDUCTION, null_move=False)
+    state.apply_null()
+    try:
+        score = -compute_state_score(**reduced_search, alpha=-beta, beta=-beta + NULL_WINDOW)
+    finally:
+        state.undo_null()
+    if score < beta:
+        return None
+    verification_search = dict(child_search, depth=depth - NULL_MOVE_REDUCTION, null_move=False)
+    score = compute_state_score(**verification_search, alpha=beta - NULL_WINDOW, beta=beta)
+    if score < beta:
+        return None
+    if child_search["stats"] is not None:
+        child_search["stats"].null_move_cutoffs += 1
+    return score
+
+
+def compute_quiescence_score(
+    *,
+    state: SearchStateAbalone,
+    heuristic,
+    max_depth: int,
+    alpha=-inf,
+    beta=inf,
+    deadline=inf,
+    stop=None,
+    stats: Optional[SearchStats] = None
+) -> float:
+    """
+    Extends the search at the leaves over the ejections and the pushes threatening an ejection until the state is quiet,
+    so that the heuristic is not applied in the middle of an exchange.
+    The player to move can stand pat: keep the heuristic score of the state instead of playing a tactical move.
+
+    Args:
+        state (SearchStateAbalone): Current game state representation
+        heuristic (function): Heuristic function
+        max_depth (int): Maximum number of tactical moves played in a row
+        alpha (float): Lower bound of the search window
+        beta (float): Upper bound of the search window
+        deadline (float): perf_counter() value after which the search is interrupted by SearchTimeout
+        stop (Optional[multiprocessing.Value]): Flag interrupting the search by SearchTimeout once set,
+            for the helpers of the Lazy SMP search
+        stats (Optional[SearchStats]): Counters of the search
+
+    Returns:
+        float: score of the state
+    """
+    if perf_counter() > deadline or (stop is not None and stop.value):
+        raise SearchTimeout()
+    if stats is not None:
+        stats.quiescence_nodes += 1
+    if state.is_done():
+        return compute_terminal_state_score(state)
+    # stand pat
+    score = heuristic(state)
+    if stats is not None:
+        stats.leaf_evaluations += 1
+    if score >= beta or max_depth == 0:
+        return score
+    alpha = max(alpha, score)
+    for move in state.generate_tactical_moves():
+        state.apply(move)
+        try:
+            child_score = compute_quiescence_score(
+                state=state,
+                heuristic=heuristic,
+                max_depth=max_depth - 1,
+                alpha=-beta,
+                beta=-alpha,
+                deadline=deadline,
+                stop=stop,
+                stats=stats,
+            )
+        finally:
+            state.undo(move)
+        if -child_score > score:
+            score = -child_score
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+    return score
 
 
 def compute_state_score(
     *,
-    state: GameState,
+    state: SearchStateAbalone,
     depth: int,
     heuristic,
-    table: Dict,
+    table: TranspositionTable,
     quiescence_test: bool,
-    previous_state: GameState,
-    quiescence_search_depth=1,
+    quiescence_search_depth=4,
     alpha=-inf,
-    beta=inf
+    beta=inf,
+    deadline=inf,
+    stop=None,
+    orderer: Optional[MoveOrderer] = None,
+    algorithm: str = ALPHA_BETA,
+    reductions: bool = False,
+    null_move: bool = False,
+    stats: Optional[SearchStats] = None
 ) -> float:
     """
-    Computes the score of the state for using negamax with alpha-beta pruning and transposition table, fills transposition table
+    Computes the score of the state for using negamax with alpha-beta pruning and transposition table, fills transposition table.
+    The moves are played and taken back in place on the state.
 
     Args:
-        state (GameState): Current game state representation
+        state (SearchStateAbalone): Current game state representation
         depth (int): Depth of the search
         heuristic (function): Heuristic function
-        table (Dict): Transposition table
-        quiescence_test (bool): Whether to use quiescence search or not
-        previous_state (GameState): Previous game state representation
-        quiescence_search_depth (int): Depth of the quiescence search
+        table (TranspositionTable): Transposition table
+        quiescence_test (bool): Whether to use quiescence search at the leaves or not
+        quiescence_search_depth (int): Maximum depth of the quiescence search
         alpha (int): Value of the best choice currently found for max player on the path from a node to the root
         beta (int): Value of the best choice currently found for the min player on the path from a node to the root
+        deadline (float): perf_counter() value after which the search is interrupted by SearchTimeout
+        stop (Optional[multiprocessing.Value]): Flag interrupting the search by SearchTimeout once set,
+            for the helpers of the Lazy SMP search
+        orderer (Optional[MoveOrderer]): Move ordering of the search, moves are searched in generation order if None
+        algorithm (str): ALPHA_BETA searches all the moves with the window of the node,
+            PVS searches the moves after the first one with a null window and again with the full window if they fail high
+        reductions (bool): Whether to search the late quiet moves at reduced depth first (late move reductions)
+        null_move (bool): Whether to use null move pruning
+        stats (Optional[SearchStats]): Counters of the search
 
     Returns:
         float: score of the state
     """
+    if perf_counter() > deadline or (stop is not None and stop.value):
+        raise SearchTimeout()
+    if stats is not None:
+        stats.nodes += 1
+        stats.nodes_by_depth[depth] += 1
 
     # Lookup in transposition table
-    table_key, lookup_result = lookup_score(state, depth, table)
+    alpha_original = alpha
+    table_key, lookup_result, alpha, beta, tt_move = lookup_score(
+        state, depth, table, alpha, beta, stats
+    )
+    best_move = None
+    bound = EXACT
     if lookup_result is not None:
-        score = lookup_result
+        return lookup_result
     elif state.is_done():
         # Terminal state
         score = compute_terminal_state_score(state)
         depth = inf
     elif depth == 0:
         # Non-terminal state at max depth
-        # use quiescence search if a piece was just pushed
-        if quiescence_test and push_happened(state, previous_state):
-            score = compute_state_score(
+        # resolve the pending ejections before using the heuristic
+        if quiescence_test:
+            score = compute_quiescence_score(
                 state=state,
-                depth=quiescence_search_depth,
                 heuristic=heuristic,
-                table=table,
-                previous_state=previous_state,
-                quiescence_test=False,
-                quiescence_search_depth=quiescence_search_depth,
-                alpha=-beta,
-                beta=-alpha,
+                max_depth=quiescence_search_depth,
+                alpha=alpha,
+                beta=beta,
+                deadline=deadline,
+                stop=stop,
+                stats=stats,
             )
+            bound = get_bound(score, alpha_original, beta)
         else:
             score = heuristic(state)
+            if stats is not None:
+                stats.leaf_evaluations += 1
     else:
         # Non-terminal state at non-max depth
+        child_search = dict(
+            state=state,
+            depth=depth - 1,
+            heuristic=heuristic,
+            table=table,
+            quiescence_test=quiescence_test,
+            quiescence_search_depth=quiescence_search_depth,
+            deadline=deadline,
+            stop=stop,
+            orderer=orderer,
+            algorithm=algorithm,
+            reductions=reductions,
+            null_move=null_move,
+            stats=stats,
+        )
+        null_move_score = search_null_move(child_search, beta) if null_move else None
+        if null_move_score is not None:
+            return null_move_score
         score = -inf
-        children = state.get_possible_actions()
-        for child in children:
-            child_score = compute_state_score(
-                state=child.get_next_game_state(),
-                depth=depth - 1,
-                heuristic=heuristic,
-                table=table,
-                previous_state=state,
-                quiescence_test=quiescence_test,
-                quiescence_search_depth=quiescence_search_depth,
-                alpha=-beta,
-                beta=-alpha,
-            )
-            score = max(score, -child_score)
+        if orderer is not None:
+            moves = orderer.iter_moves(state, tt_move)
+        else:
+            moves = state.generate_moves()
+        can_reduce = reductions and depth >= LMR_MIN_DEPTH and not is_critical(state, depth)
+        if stats is not None:
+            stats.expanded_nodes += 1
+        for index, move in enumerate(moves):
+            if stats is not None:
+                stats.moves_searched += 1
+            state.apply(move)
+            try:
+                child_score = search_child(
+                    child_search,
+                    alpha,
+                    beta,
+                    algorithm == PVS and best_move is not None,
+                    can_reduce and index >= LMR_MIN_INDEX and not move & MOVE_OPP_MASK,
+                )
+            finally:
+                state.undo(move)
+            if -child_score > score or best_move is None:
+                score = -child_score
+                best_move = move
             alpha = max(alpha, score)
             if alpha >= beta:
+                if stats is not None:
+                    stats.cutoffs += 1
+                    stats.cutoffs_by_move_index[index] += 1
+                if orderer is not None:
+                    orderer.record_cutoff(move, state.next_side, state.step, depth)
                 break
+        bound = get_bound(score, alpha_original, beta)
 
     # Update transposition table
-    table[table_key] = {SCORE: score, DEPTH: depth, PLAYER: state.get_next_player()}
+    table.store(table_key, score, depth, bound, best_move)
+    if stats is not None:
+        stats.tt_stores += 1
 
     return score
 
 
+def order_root_moves(state: SearchStateAbalone, first_move: Optional[Move], orderer: Optional[MoveOrderer]) -> List[Move]:
+    """
+    Generates the moves of the root of a search, in the order they are searched.
+
+    Args:
+        state (SearchStateAbalone): Current game state representation
+        first_move (Optional[Move]): Move to search first, typically the best move of the previous iteration
+        orderer (Optional[MoveOrderer]): Move ordering of the search
+
+    Returns:
+        List[Move]: moves of the next player
+    """
+    moves = state.generate_moves()
+    if orderer is not None:
+        moves = orderer.order_moves(moves, state.next_side, state.step, first_move)
+    elif first_move in moves:
+        moves.remove(first_move)
+        moves.insert(0, first_move)
+    return moves
+
+
+def compute_best_move(
+    *,
+    state: SearchStateAbalone,
+    depth: int,
+    heuristic,
+    table: TranspositionTable,
+    quiescence_test: bool,
+    quiescence_search_depth=4,
+    first_move: Optional[Move] = None,
+    alpha=-inf,
+    beta=inf,
+    deadline=inf,
+    stop=None,
+    orderer: Optional[MoveOrderer] = None,
+    algorithm: str = ALPHA_BETA,
+    reductions: bool = False,
+    null_move: bool = False,
+    stats: Optional[SearchStats] = None
+) -> (Move, float):
+    """
+    Searches the children of the state and returns the move leading to the best one.
+    With a window narrower than (-inf, inf), the score is only a bound when it falls outside of the window.
+
+    Args:
+        state (SearchStateAbalone): Current game state representation
+        depth (int): Depth of the search
+        heuristic (function): Heuristic function
+        table (TranspositionTable): Transposition table
+        quiescence_test (bool): Whether to use quiescence search at the leaves or not
+        quiescence_search_depth (int): Maximum depth of the quiescence search
+        first_move (Optional[Move]): Move to search first, typically the best move of the previous iteration
+        alpha (float): Lower bound of the search window
+        beta (float): Upper bound of the search window
+        deadline (float): perf_counter() value after which the search is interrupted by SearchTimeout
+        stop (Optional[multiprocessing.Value]): Flag interrupting the search by SearchTimeout once set,
+            for the helpers of the Lazy SMP search
+        orderer (Optional[MoveOrderer]): Move ordering of the search
+        algorithm (str): Search algorithm, ALPHA_BETA or PVS
+        reductions (bool): Whether to use late move reductions below the root
+        null_move (bool): Whether to use null move pruning below the root
+        stats (Optional[SearchStats]): Counters of the search
+
+    Returns:
+        Move: best move found
+        float: score of the state
+    """
+    moves = order_root_moves(state, first_move, orderer)
+    best_move = None
+    best_score = -inf
+    child_search = dict(
+        state=state,
+        depth=depth - 1,
+        heuristic=heuristic,
+        table=table,
+        quiescence_test=quiescence_test,
+        quiescence_search_depth=quiescence_search_depth,
+        deadline=deadline,
+        stop=stop,
+        orderer=orderer,
+        algorithm=algorithm,
+        reductions=reductions,
+        null_move=null_move,
+        stats=stats,
+    )
+    for move in moves:
+        state.apply(move)
+        try:
+            score = -search_child(
+                child_search, max(alpha, best_score), beta, algorithm == PVS and best_move is not None
+            )
+        finally:
+            state.undo(move)
+        if best_move is None or score > best_score:
+            best_move = move
+            best_score = score
+            if best_score >= beta:
+                break
+    return best_move, best_score
+
+
+def compute_best_move_with_aspiration(
+    *,
+    previous_score: Optional[float],
+    window: Optional[float],
+    stats: Optional[SearchStats] = None,
+    root_search=compute_best_move,
+    **search
+) -> (Move, float):
+    """
+    Runs compute_best_move with an aspiration window: a narrow window around the score of the previous iteration,
+    which causes more cutoffs. The window is widened and the search done again when the score falls outside of it.
+    A won or lost score is exact whatever the window, so it ends the search, as does a failure on a side of the window
+    that is already open.
+
+    Args:
+        previous_score (Optional[float]): Score of the previous iteration, the full window is used if None or infinite
+        window (Optional[float]): Half width of the first window, the full window is used if None
+        stats (Optional[SearchStats]): Counters of the search, also counting the fail-lows and fail-highs of the windows
+        root_search (function): Search of the root, compute_best_move or ParallelRootSearch.compute_best_move
+        **search: Other arguments of compute_best_move
+
+    Returns:
+        Move: best move found
+        float: score of the state
+    """
+    if window is None or previous_score is None or abs(previous_score) == inf:
+        return root_search(**search, stats=stats)
+    alpha = previous_score - window
+    beta = previous_score + window
+    while True:
+        best_move, score = root_search(**search, alpha=alpha, beta=beta, stats=stats)
+        if alpha < score < beta or abs(score) == inf:
+            return best_move, score
+        if (score <= alpha and alpha == -inf) or (score >= beta and beta == inf):
+            return best_move, score
+        window *= ASPIRATION_GROWTH
+        search["first_move"] = best_move
+        if score <= alpha:
+            if stats is not None:
+                stats.aspiration_fail_lows += 1
+            alpha = previous_score - window if window < MAX_ASPIRATION_WINDOW else -inf
+        else:
+            if stats is not None:
+                stats.aspiration_fail_highs += 1
+            beta = previous_score + window if window < MAX_ASPIRATION_WINDOW else inf
+
+
+# ---------------------------- Parallel search ----------------------------#
+
+# Parallel search algorithms of MyPlayer
+ROOT_PARALLEL = "root"
+LAZY_SMP = "lazysmp"
+
+# State of a worker process of the root-parallel search, set by init_search_worker
+worker_context = {}
+
+
+def init_search_worker(shared_alpha, generation, table_memory_mb: float) -> None:
+    """
+    Initializes a worker process of the root-parallel search with its own transposition table and move ordering.
+
+    Args:
+        shared_alpha (multiprocessing.Value): Best score of the root moves searched so far, shared by all the processes
+        generation (multiprocessing.Value): Number of the current root search, the tasks of older ones are skipped
+        table_memory_mb (float): Memory budget of the transposition table of the worker in MB
+    """
+    worker_context["shared_alpha"] = shared_alpha
+    worker_context["generation"] = generation
+    worker_context["table"] = TranspositionTable(table_memory_mb)
+    worker_context["orderer"] = MoveOrderer()
+    worker_context["search_id"] = None
+
+
+def search_root_move(
+    state: SearchStateAbalone, move: Move, search: dict, beta: float, search_id: int, generation: int
+) -> Optional[Tuple[float, float, SearchStats]]:
+    """
+    Searches a root move in a worker process, with the best score of the root moves searched so far as alpha.
+
+    Args:
+        state (SearchStateAbalone): Root of the search
+        move (Move): Root move to search
+        search (dict): Arguments of compute_state_score for the child, except the state, the table,
+            the move ordering, the counters and the window
+        beta (float): Upper bound of the window of the root
+        search_id (int): Identifier of the search of the player, the worker starts a new search when it changes
+        generation (int): Number of the root search of the task
+
+    Returns:
+        Optional[Tuple[float, float, SearchStats]]: score of the move for the player at the root,
+            alpha used to search it and counters of the search,
+            None if the root search was abandoned or went past its deadline
+    """
+    if worker_context["generation"].value != generation:
+        return None
+    table = worker_context["table"]
+    orderer = worker_context["orderer"]
+    if worker_context["search_id"] != search_id:
+        table.new_search()
+        orderer.new_search()
+        worker_context["search_id"] = search_id
+    shared_alpha = worker_context["shared_alpha"]
+    alpha = shared_alpha.value
+    stats = SearchStats()
+    state.apply(move)
+    child_search = dict(search, state=state, table=table, orderer=orderer, stats=stats)
+    try:
+        score = -search_child(child_search, alpha, beta, True)
+    except SearchTimeout:
+        return None
+    if score > alpha:
+        with shared_alpha.get_lock():
+            shared_alpha.value = max(shared_alpha.value, score)
+    return score, alpha, stats
+
+
+class ParallelRootSearch:
+    """
+    Root-parallel search with the Young Brothers Wait scheme: the first root move is searched in the player process
+    to get a bound, then the other ones are distributed to worker processes,
+    which share the best score found so far as alpha through shared memory.
+    Each worker has its own search state, transposition table and move ordering, kept from one move to the next.
+    The transposition tables aren't shared: the workers don't see the table of the player process nor each other's.
+    The states are sent as SearchStateAbalone, which is compact and picklable, unlike GameStateAbalone and its players.
+
+    Attributes:
+        workers (int): Number of worker processes.
+        table_memory_mb (float): Memory budget of the transposition table of each worker in MB.
+    """
+
+    def __init__(self, workers: int, table_memory_mb: float = 64) -> None:
+        self.workers = workers
+        self.table_memory_mb = table_memory_mb
+        self.executor = None
+        self.shared_alpha = None
+        self.generation = None
+
+    def start(self) -> None:
+        """
+        Starts the worker processes, if they aren't running yet.
+        """
+        if self.executor is not None:
+            return
+        self.shared_alpha = multiprocessing.Value("d", -inf)
+        self.generation = multiprocessing.Value("i", 0)
+        self.executor = ProcessPoolExecutor(
+            self.workers,
+            initializer=init_search_worker,
+            initargs=(self.shared_alpha, self.generation, self.table_memory_mb),
+        )
+
+    def shutdown(self) -> None:
+        """
+        Stops the worker processes.
+        """
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def compute_best_move(
+        self,
+        *,
+        state: SearchStateAbalone,
+        depth: int,
+        heuristic,
+        table: TranspositionTable,
+        quiescence_test: bool,
+        quiescence_search_depth=4,
+        first_move: Optional[Move] = None,
+        alpha=-inf,
+        beta=inf,
+        deadline=inf,
+        stop=None,
+        orderer: Optional[MoveOrderer] = None,
+        algorithm: str = ALPHA_BETA,
+        reductions: bool = False,
+        null_move: bool = False,
+        stats: Optional[SearchStats] = None
+    ) -> (Move, float):
+        """
+        Parallel version of compute_best_move, with the same arguments.
+        The heuristic must be picklable, as the functions defined at the top level of a module.
+        The deadline is a perf_counter() value, which is system-wide on Linux and Windows.
+
+        Returns:
+            Move: best move found
+            float: score of the state
+        """
+        moves = order_root_moves(state, first_move, orderer)
+        child_search = dict(
+            state=state,
+            depth=depth - 1,
+            heuristic=heuristic,
+            table=table,
+            quiescence_test=quiescence_test,
+            quiescence_search_depth=quiescence_search_depth,
+            deadline=deadline,
+            stop=stop,
+            orderer=orderer,
+            algorithm=algorithm,
+            reductions=reductions,
+            null_move=null_move,
+            stats=stats,
+        )
+        best_move = moves[0]
+        state.apply(best_move)
+        try:
+            best_score = -search_child(child_search, alpha, beta, False)
+        finally:
+            state.undo(best_move)
+        if best_score >= beta or len(moves) == 1:
+            return best_move, best_score
+
+        self.start()
+        self.shared_alpha.value = max(alpha, best_score)
+        generation = self.generation.value
+        worker_search = {
+            key: value for key, value in child_search.items() if key not in ("state", "table", "orderer", "stats")
+        }
+        # the tasks are pickled in the background, they get a copy that isn't modified by the next searches
+        root = state.copy()
+        futures = [
+            self.executor.submit(search_root_move, root, move, worker_search, beta, state.step, generation)
+            for move in moves[1:]
+        ]
+        try:
+            for move, future in zip(moves[1:], futures):
+                result = future.result()
+                if result is None:
+                    raise SearchTimeout()
+                score, move_alpha, move_stats = result
+                if stats is not None:
+                    stats.add(move_stats)
+                # a score not above the alpha of its search is only an upper bound
+                if score > move_alpha and score > best_score:
+                    best_move = move
+                    best_score = score
+                    if best_score >= beta:
+                        break
+        finally:
+            # abandon the tasks not started yet
+            with self.generation.get_lock():
+                self.generation.value += 1
+            for future in futures:
+                future.cancel()
+        return best_move, best_score
+
+
+def init_helper_worker(table: SharedTranspositionTable, stop) -> None:
+    """
+    Initializes a helper process of the Lazy SMP search with the shared transposition table and its own move ordering.
+
+    Args:
+        table (SharedTranspositionTable): Transposition table shared by all the processes
+        stop (multiprocessing.Value): Set by the player process when it has chosen its move
+    """
+    worker_context["table"] = table
+    worker_context["stop"] = stop
+    worker_context["orderer"] = MoveOrderer()
+    worker_context["search_id"] = None
+
+
+def run_helper_search(state: SearchStateAbalone, helper: int, search: dict, max_depth: int, search_id: int) -> SearchStats:
+    """
+    Iterative deepening of a helper process of the Lazy SMP search, which only fills the shared transposition table.
+    The odd helpers search one ply deeper than the even ones and each helper orders the moves with its own history,
+    so that the processes don't search the same nodes at the same time.
+    A helper stops as soon as the player process has chosen its move, or at the deadline.
+
+    Args:
+        state (SearchStateAbalone): Root of the search
+        helper (int): Index of the helper
+        search (dict): Arguments of compute_best_move, except the state, the depth, the table, the move ordering,
+            the counters and the first move
+        max_depth (int): Depth of the last iteration
+        search_id (int): Identifier of the search of the player, the helper starts a new search when it changes
+
+    Returns:
+        SearchStats: counters of the search of the helper
+    """
+    orderer = worker_context["orderer"]
+    if worker_context["search_id"] != search_id:
+        orderer.new_search()
+        worker_context["search_id"] = search_id
+    stop = worker_context["stop"]
+    stats = SearchStats()
+    best_move = None
+    for depth in range(1 + helper % 2, max_depth + 1):
+        if stop.value:
+            break
+        try:
+            best_move, _ = compute_best_move(
+                **search,
+                state=state,
+                depth=depth,
+                table=worker_context["table"],
+                orderer=orderer,
+                first_move=best_move,
+                stats=stats,
+                stop=stop,
+            )
+        except SearchTimeout:
+            break
+    return stats
+
+
+class LazySMPSearch:
+    """
+    Lazy SMP search: helper processes run the same iterative deepening as the player process on the same root,
+    all of them sharing a SharedTranspositionTable. The helpers don't choose moves,
+    the entries they store make the search of the player process faster.
+    Unlike the root-parallel search, it keeps all the processes busy when a single root move takes most of the search.
+
+    Attributes:
+        workers (int): Number of helper processes.
+        table (SharedTranspositionTable): Transposition table shared by the player process and the helpers.
+    """
+
+    def __init__(self, workers: int, table_memory_mb: float = 64) -> None:
+        self.workers = workers
+        self.table = SharedTranspositionTable(table_memory_mb)
+        self.executor = None
+        self.stop = None
+        self.futures = []
+
+    def start(self) -> None:
+        """
+        Starts the helper processes, if they aren't running yet.
+        """
+        if self.executor is not None:
+            return
+        # read at every node of the helpers, without a lock
+        self.stop = multiprocessing.Value("b", 0, lock=False)
+        self.executor = ProcessPoolExecutor(
+            self.workers,
+            initializer=init_helper_worker,
+            initargs=(self.table, self.stop),
+        )
+
+    def start_helpers(self, state: SearchStateAbalone, max_depth: int, search: dict) -> None:
+        """
+        Starts the search of the helpers from a state, in the background.
+
+        Args:
+            state (SearchStateAbalone): Root of the search
+            max_depth (int): Depth of the last iteration
+            search (dict): Arguments of compute_best_move, except the state, the depth, the table, the move ordering,
+                the counters and the first move. The heuristic must be picklable and the deadline set.
+        """
+        self.start()
+        self.stop.value = 0
+        # the tasks are pickled in the background, they get a copy that isn't modified by the search
+        root = state.copy()
+        self.futures = [
+            self.executor.submit(run_helper_search, root, helper, search, max_depth, state.step)
+            for helper in range(self.workers)
+        ]
+
+    def stop_helpers(self) -> None:
+        """
+        Stops the helpers and waits for them, so that they don't search during the next move.
+        They stop at their next node.
+        """
+        if self.stop is not None:
+            self.stop.value = 1
+        wait(self.futures)
+        self.futures = []
+
+    def shutdown(self) -> None:
+        """
+        Stops the helper processes and frees the shared table.
+        """
+        self.stop_helpers()
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+        self.table.close()
+
+
 # ---------------------------- Player ----------------------------#
 
 
@@ -409,10 +1108,42 @@ class MyPlayer(PlayerAbalone):
         super().__init__(piece_type, name, time_limit, *args)
         self.game_tree = None
         self.heuristic = score_distance_adjacency_sym
-        self.table = {}
-        self.search_depth = 3
-        self.quiescence_search_depth = 1
+        # memory budget of the transposition table in MB
+        self.table_memory_mb = 64
+        self.table = TranspositionTable(self.table_memory_mb)
+        # iterative deepening stops at this depth or when the time manager says so
+        self.max_search_depth = 10
+        # depth of the last completed iteration
+        self.search_depth = 0
+        self.time_manager = TimeManagerAbalone()
+        self.move_orderer = MoveOrderer()
+        # pieces of the player after its last move, to detect the pushes of the opponent
+        self.previous_mask = None
+        # maximum number of ejections and threatening pushes searched after the leaves
+        self.quiescence_search_depth = 4
         self.use_quiescence_test = True
+        # search algorithm, ALPHA_BETA or PVS
+        self.search_algorithm = PVS
+        # half width of the aspiration window around the score of the previous iteration, None for full windows
+        self.aspiration_window = 1
+        # selective search: prunes and reduces the moves unlikely to change the best move to search deeper
+        self.use_late_move_reductions = True
+        self.use_null_move_pruning = True
+        # counters of the search of the last move
+        self.stats = SearchStats()
+        # JSON lines file receiving the counters of the search of each move, None to keep them in the decisions only
+        self.stats_path = None
+        # JSON file receiving the time spent in each phase of the search of each move of the game,
+        # None to disable the profiling
+        self.profile_path = None
+        self.profiler = None
+        # processes searching each move, 1 keeps the search in the player process,
+        # more starts worker processes for the parallel search, which must be allowed to use that many cores
+        self.search_workers = 1
+        # parallel search algorithm, ROOT_PARALLEL or LAZY_SMP
+        self.parallel_algorithm = ROOT_PARALLEL
+        self.parallel_search = None
+        self.lazy_smp = None
 
     def to_json(self):
         return ""
@@ -428,28 +1159,114 @@ class MyPlayer(PlayerAbalone):
         Returns:
             Action: selected feasible action
         """
-        # Play fast if no time left
-        if self.get_remaining_time() < 60:
-            self.search_depth = 2
-            self.use_quiescence_test = False
-
-        # Compute score of current state and incidentally the scores of the children
-        compute_state_score(
-            state=current_state,
-            depth=self.search_depth,
+        if self.profile_path is not None:
+            if self.profiler is None:
+                self.profiler = SearchProfiler()
+            self.profiler.start_move(current_state.step)
+        state = current_state.get_search_state()
+        state.track_features()
+        side = state.next_side
+        pushed = (
+            self.previous_mask is not None
+            and self.previous_mask != state.board.masks[side]
+        )
+        deadline = self.time_manager.start_move(
+            self.get_remaining_time(), state.step, pushed
+        )
+        self.move_orderer.new_search()
+        self.stats.reset()
+        max_depth = min(self.max_search_depth, state.max_step - state.step)
+        search = dict(
             heuristic=self.heuristic,
-            table=self.table,
-            previous_state=current_state,
             quiescence_search_depth=self.quiescence_search_depth,
             quiescence_test=self.use_quiescence_test,
+            algorithm=self.search_algorithm,
+            reductions=self.use_late_move_reductions,
+            null_move=self.use_null_move_pruning,
         )
-
-        # Use the transposition table to get the best action
-        next_action = max(
-            current_state.get_possible_actions(),
-            key=lambda x: -(
-                lookup_score(x.get_next_game_state(), -inf, self.table)[1] or inf
-            ),
-        )
-
-        return next_action
+        table = self.table
+        root_search = compute_best_move
+        if self.search_workers > 1 and self.parallel_algorithm == LAZY_SMP:
+            if self.lazy_smp is None:
+                # the player process searches too
+                self.lazy_smp = LazySMPSearch(self.search_workers - 1, self.table_memory_mb)
+            table = self.lazy_smp.table
+            self.lazy_smp.start_helpers(state, max_depth, dict(search, deadline=deadline))
+        elif self.search_workers > 1:
+            if self.parallel_search is None:
+                self.parallel_search = ParallelRootSearch(self.search_workers, self.table_memory_mb)
+            root_search = self.parallel_search.compute_best_move
+        table.new_search()
+        if self.profile_path is not None:
+            search["heuristic"] = self.profiler.instrument_search(state, table, self.move_orderer, search["heuristic"])
+
+        try:
+            # Iterative deepening: search depth 1, 2, 3, ... in place until the time allotted to the move is spent,
+            # keeping the best move of the last completed iteration
+            best_move = None
+            score = None
+            for depth in range(1, max_depth + 1):
+                iteration_start = perf_counter()
+                try:
+                    best_move, score = compute_best_move_with_aspiration(
+                        previous_score=score,
+                        window=self.aspiration_window,
+                        root_search=root_search,
+                        **search,
+                        state=state,
+                        depth=depth,
+                        table=table,
+                        first_move=best_move,
+                        orderer=self.move_orderer,
+                        stats=self.stats,
+                        # the first iteration always completes so that there is a move to play
+                        deadline=deadline if depth > 1 else inf,
+                    )
+                except SearchTimeout:
+                    self.time_manager.timeout()
+                    break
+                self.search_depth = depth
+                self.stats.record_iteration(depth, perf_counter() - iteration_start)
+                if not self.time_manager.continue_search(depth, best_move, score):
+                    break
+            decision = self.time_manager.end_move()
+            decision["move"] = move_to_str(best_move)
+            decision.update(self.stats.to_dict())
+            if self.stats_path is not None:
+                self.stats.emit(
+                    self.stats_path, player=self.get_name(), step=state.step, move=decision["move"], depth=self.search_depth
+                )
+
+            state.apply(best_move)
+            self.previous_mask = state.board.masks[side]
+            # the player doesn't play again if the game ends with this move or with the next move of the opponent
+            last_move = state.is_done() or state.step + 1 >= state.max_step
+            state.undo(best_move)
+            action = state.to_action(best_move, current_state)
+        finally:
+            # the helpers stop writing to the shared table and the objects of the search get back their own methods
+            # even if the search fails
+            if self.lazy_smp is not None:
+                self.lazy_smp.stop_helpers()
+            if self.profile_path is not None:
+                self.profiler.restore()
+        if self.profile_path is not None:
+            self.profiler.end_move()
+            self.profiler.write_report(self.profile_path, player=self.get_name())
+        if last_move:
+            self.shutdown()
+        return action
+
+    def shutdown(self) -> None:
+        """
+        Stops the worker processes of the parallel search at the end of the game
+        and frees the transposition table shared with the helpers of the Lazy SMP search.
+        The player calls it after its last move, MasterAbalone and tournament_abalone when a game ends before.
+        The workers are started again if the player searches another move.
+        """
+        if self.parallel_search is not None:
+            self.parallel_search.shutdown()
+            self.parallel_search = None
+        if self.lazy_smp is not None:
+            self.lazy_smp.shutdown()
+            self.lazy_smp = None
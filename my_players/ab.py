@@ -5,7 +5,7 @@ from search.ab_negamax_game_tree import compute_state_score, lookup_score
 from keys import STATE, ACTION, SCORE, CHILDREN, NEXT, DEPTH, TURN
 from keys import CUTOFFS, COMPUTED_NODES, SUCCESSFUL_LOOKUPS
 from math import inf
-from utils import get_opponent, score_and_distance_sym, get_pushes2
+from utils import get_opponent, search_state_score_and_distance_sym, get_pushes2
 
 class MyPlayer(PlayerAbalone):
     """
@@ -29,7 +29,7 @@ class MyPlayer(PlayerAbalone):
         super().__init__(piece_type, name, time_limit, *args)
         self.game_tree = None
         self.computed_nodes = 0
-        self.heuristic = score_and_distance_sym
+        self.heuristic = search_state_score_and_distance_sym
         self.table = {}
         self.search_depth = 3
         self.quiescence_search_depth = 1
@@ -55,18 +55,22 @@ class MyPlayer(PlayerAbalone):
             self.use_quiescence_test = False
 
         # compute score of current state and incidentally the scores of the children
+        state = current_state.get_search_state()
         compute_state_score(
-            state=current_state,
+            state=state,
             depth = self.search_depth,
             heuristic=self.heuristic,
             table=self.table,
-            previous_state=current_state,
             quiescence_search_depth=self.quiescence_search_depth,
             quiescence_test=self.use_quiescence_test)
 
         # use the transposition table to get the best action
-        next_action = max(
-                current_state.get_possible_actions(),
-                key=lambda x: - (lookup_score(x.get_next_game_state(), -inf, self.table)[1] or inf))
+        def child_score(move):
+            state.apply(move)
+            score = lookup_score(state, -inf, self.table)[1]
+            state.undo(move)
+            return - (score or inf)
 
-        return next_action
+        next_move = max(state.generate_moves(), key=child_score)
+
+        return state.to_action(next_move, current_state)
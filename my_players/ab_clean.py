@@ -5,7 +5,7 @@ from search.ab_negamax_game_tree import compute_state_score
 from keys import STATE, ACTION, SCORE, CHILDREN, NEXT, DEPTH, TURN
 from keys import CUTOFFS, COMPUTED_NODES, SUCCESSFUL_LOOKUPS
 from math import inf
-from utils import get_opponent, score_and_distance_sym
+from utils import get_opponent, search_state_score_and_distance_sym
 
 
 class MyPlayer(PlayerAbalone):
@@ -30,7 +30,7 @@ class MyPlayer(PlayerAbalone):
         super().__init__(piece_type, name, time_limit, *args)
         self.game_tree = None
         self.computed_nodes = 0
-        self.heuristic = score_and_distance_sym
+        self.heuristic = search_state_score_and_distance_sym
         self.table = {}
         self.search_depth = 2
 
@@ -48,15 +48,20 @@ class MyPlayer(PlayerAbalone):
         Returns:
             Action: selected feasible action
         """
-        next_action = max(
-                current_state.get_possible_actions(),
-                key=lambda x:
-                    - compute_state_score(
-                        state=x.get_next_game_state(),
+        state = current_state.get_search_state()
+
+        def child_score(move):
+            state.apply(move)
+            score = - compute_state_score(
+                        state=state,
                         depth=self.search_depth - 1,
                         heuristic=self.heuristic,
                         table=self.table,
                         quiescence_test=False,
-                        previous_state=current_state))
+                        previous_move=move)
+            state.undo(move)
+            return score
+
+        next_move = max(state.generate_moves(), key=child_score)
 
-        return next_action
+        return state.to_action(next_move, current_state)
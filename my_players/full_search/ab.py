@@ -2,6 +2,7 @@ from player_abalone import PlayerAbalone
 from seahorse.game.action import Action
 from seahorse.game.game_state import GameState
 from search.full.ab_negamax_game_tree import create_game_tree, compute_score, expand
+from search_stats import SearchStats
 from keys import STATE, ACTION, SCORE, CHILDREN, NEXT
 from math import inf
 from utils import get_opponent, score_and_distance
@@ -28,8 +29,13 @@ class MyPlayer(PlayerAbalone):
         """
         super().__init__(piece_type, name, time_limit, *args)
         self.game_tree = None
-        self.computed_nodes = 0
+        # counters of the searches of the game
+        self.stats = SearchStats()
+        # JSON lines file receiving the counters after each move, None to keep them in stats only
+        self.stats_path = None
         self.heuristic = None
+        # evaluates a list of states in one call, used instead of heuristic to sort the children if set
+        self.batch_heuristic = None
         self.table = None
 
     def to_json(self):
@@ -58,7 +64,9 @@ class MyPlayer(PlayerAbalone):
             compute_score(
                 game_tree=self.game_tree,
                 heuristic=self.heuristic,
-                table=self.table)
+                table=self.table,
+                batch_heuristic=self.batch_heuristic,
+                stats=self.stats)
 
         # retrieve the current state in the tree after the opponent's move
         if current_state.rep != self.game_tree[STATE].rep:
@@ -69,7 +77,9 @@ class MyPlayer(PlayerAbalone):
             compute_score(
                 game_tree=self.game_tree,
                 heuristic=self.heuristic,
-                table=self.table)
+                table=self.table,
+                batch_heuristic=self.batch_heuristic,
+                stats=self.stats)
 
         # next_node = self.game_tree[NEXT]
         next_node = max(self.game_tree[CHILDREN].values(
@@ -80,6 +90,7 @@ class MyPlayer(PlayerAbalone):
         # use the next state as the root of the tree
         self.game_tree = next_node
 
-        print(self.info)
+        if self.stats_path is not None:
+            self.stats.emit(self.stats_path, player=self.get_name(), step=current_state.step)
         print("USING NEGAMAX")
         return chosen_action
@@ -1,6 +1,7 @@
 from utils import score_and_distance_sym
 from keys import STATE
 from ab import MyPlayer as MyPlayerAB
+from batch_evaluator_abalone import HAS_NUMPY, evaluate_game_states
 
 
 class MyPlayer(MyPlayerAB):
@@ -23,3 +24,6 @@ class MyPlayer(MyPlayerAB):
         super().__init__(piece_type, name, time_limit, *args)
         self.game_tree = None
         self.heuristic = lambda x: score_and_distance_sym(x[STATE])
+        if HAS_NUMPY:
+            # same as score_and_distance_sym
+            self.batch_heuristic = lambda states: evaluate_game_states(states, {"score": 1, "center": 1})
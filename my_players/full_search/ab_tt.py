@@ -22,6 +22,4 @@ class MyPlayer(MyPlayerAB):
         """
         super().__init__(piece_type, name, time_limit, *args)
         self.game_tree = None
-        self.computed_nodes = 0
         self.table = {}
-        self.successful_lookups = 0
@@ -1,6 +1,7 @@
 from utils import score_and_distance_sym, get_opponent
 from keys import STATE
 from ab import MyPlayer as MyPlayerAB
+from batch_evaluator_abalone import HAS_NUMPY, evaluate_game_states
 
 
 class MyPlayer(MyPlayerAB):
@@ -22,7 +23,8 @@ class MyPlayer(MyPlayerAB):
         """
         super().__init__(piece_type, name, time_limit, *args)
         self.game_tree = None
-        self.computed_nodes = 0
         self.heuristic = lambda x: score_and_distance_sym(x[STATE])
+        if HAS_NUMPY:
+            # same as score_and_distance_sym
+            self.batch_heuristic = lambda states: evaluate_game_states(states, {"score": 1, "center": 1})
         self.table = {}
-        self.successful_lookups = 0
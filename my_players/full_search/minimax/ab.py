@@ -2,6 +2,7 @@ from player_abalone import PlayerAbalone
 from seahorse.game.action import Action
 from seahorse.game.game_state import GameState
 from search.full.ab_minimax_game_tree import create_game_tree, compute_score, expand
+from search_stats import SearchStats
 from keys import STATE, ACTION, SCORE, CHILDREN, NEXT
 from math import inf
 from utils import get_opponent
@@ -28,7 +29,10 @@ class MyPlayer(PlayerAbalone):
         """
         super().__init__(piece_type, name, time_limit, *args)
         self.game_tree = None
-        self.computed_nodes = 0
+        # counters of the searches of the game
+        self.stats = SearchStats()
+        # JSON lines file receiving the counters after each move, None to keep them in stats only
+        self.stats_path = None
         self.heuristic = None
         self.table = None
 
@@ -60,7 +64,8 @@ class MyPlayer(PlayerAbalone):
                 max_player=self,
                 min_player=self.opponent,
                 heuristic=self.heuristic,
-                table=self.table)
+                table=self.table,
+                stats=self.stats)
 
         # retrieve the current state in the tree after the opponent's move
         if current_state.rep != self.game_tree[STATE].rep:
@@ -73,7 +78,8 @@ class MyPlayer(PlayerAbalone):
                 max_player=self,
                 min_player=self.opponent,
                 heuristic=self.heuristic,
-                table=self.table)
+                table=self.table,
+                stats=self.stats)
 
         # compute the next state and action
         if self.game_tree[NEXT] is None:
@@ -86,6 +92,7 @@ class MyPlayer(PlayerAbalone):
         # use the next state as the root of the tree
         self.game_tree = self.game_tree[NEXT]
 
-        print(self.info)
+        if self.stats_path is not None:
+            self.stats.emit(self.stats_path, player=self.get_name(), step=current_state.step)
         return chosen_action
 
@@ -28,5 +28,4 @@ class MyPlayer(MyPlayerAB):
         """
         super().__init__(piece_type, name, time_limit, *args)
         self.game_tree = None
-        self.computed_nodes = 0
         self.heuristic = lambda x: -distance_to_center(x[STATE], self.get_id())
@@ -22,7 +22,6 @@ class MyPlayer(MyPlayerAB):
         """
         super().__init__(piece_type, name, time_limit, *args)
         self.game_tree = None
-        self.computed_nodes = 0
         self.heuristic = None
 
     def get_heuristic(self, state):
@@ -22,10 +22,8 @@ class MyPlayer(MyPlayerAB):
         """
         super().__init__(piece_type, name, time_limit, *args)
         self.game_tree = None
-        self.computed_nodes = 0
         self.heuristic = None
         self.table = {}
-        self.successful_lookups = 0
 
     def get_heuristic(self, state):
         opponent_id = get_opponent(state, self).get_id()
@@ -1,7 +1,8 @@
 from player_abalone import PlayerAbalone
 from seahorse.game.action import Action
 from seahorse.game.game_state import GameState
-from search.negamax_game_tree import create_game_tree, expand, compute_score
+from search.full.negamax_game_tree import create_game_tree, expand, compute_score
+from search_stats import SearchStats
 from keys import STATE, ACTION, SCORE, CHILDREN
 from math import inf
 
@@ -25,7 +26,10 @@ class MyPlayer(PlayerAbalone):
         """
         super().__init__(piece_type, name, time_limit, *args)
         self.game_tree = None
-        self.computed_nodes = 0
+        # counters of the searches of the game
+        self.stats = SearchStats()
+        # JSON lines file receiving the counters after each move, None to keep them in stats only
+        self.stats_path = None
 
     def to_json(self):
         return ""
@@ -44,7 +48,7 @@ class MyPlayer(PlayerAbalone):
         if self.game_tree is None:
             self.game_tree = create_game_tree(current_state)
             expand(self.game_tree)
-            compute_score(self.game_tree)
+            compute_score(self.game_tree, self.stats)
 
         if current_state.rep != self.game_tree[STATE].rep:
             self.game_tree = self.game_tree[CHILDREN][current_state.rep]
@@ -54,6 +58,7 @@ class MyPlayer(PlayerAbalone):
         chosen_action = next_state[ACTION]
 
         self.game_tree = next_state
-        print(self.info)
+        if self.stats_path is not None:
+            self.stats.emit(self.stats_path, player=self.get_name(), step=current_state.step)
 
         return chosen_action
@@ -2,6 +2,7 @@ from player_abalone import PlayerAbalone
 from seahorse.game.action import Action
 from seahorse.game.game_state import GameState
 from keys import STATE, ACTION
+from batch_evaluator_abalone import HAS_NUMPY, evaluate_game_states
 
 
 class MyPlayer(PlayerAbalone):
@@ -9,6 +10,8 @@ class MyPlayer(PlayerAbalone):
     Player class for Abalone game.
     The player will use the heuristic to compute the next best action (greedy approach).
     A different heuristic can be provided in subclasses 
+    When the heuristic is heuristic_combined, subclasses can give its weights in heuristics_used
+    so that all the children are evaluated in one vectorized call (if numpy is available)
 
     Attributes:
         piece_type (str): piece type of the player
@@ -25,6 +28,7 @@ class MyPlayer(PlayerAbalone):
         """
         super().__init__(piece_type, name, time_limit, *args)
         self.heuristic = None
+        self.heuristics_used = None
         self.round = 0
     
     def get_heuristic(self, state):
@@ -41,6 +45,16 @@ class MyPlayer(PlayerAbalone):
         Returns:
             Action: selected feasible action
         """
+        if HAS_NUMPY and self.heuristics_used is not None:
+            # evaluate all the children at once
+            actions = list(current_state.get_possible_actions())
+            values = evaluate_game_states(
+                [action.get_next_game_state() for action in actions], self.heuristics_used)
+            chosen_action = actions[values.index(min(values))]
+            self.round += 1
+            print("Round:", self.round)
+            return chosen_action
+
         # compute the best possible action from the heuristic
         children = {
             action.get_next_game_state().rep:
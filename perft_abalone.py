@@ -0,0 +1,181 @@
+import argparse
+import json
+from collections import Counter
+from time import perf_counter
+from typing import Any, Callable, Dict
+
+from bitboard_abalone import move_to_str
+from game_state_abalone import GameStateAbalone
+from main_abalone import LAYOUTS, create_initial_game_state
+from player_abalone import PlayerAbalone
+from search_state_abalone import SearchStateAbalone
+
+# Number of move sequences of each length from the starting layouts, index 0 being the empty sequence,
+# checked with both generators.
+# The moves are the ones of GameStateAbalone.generator, so the moves throwing a single piece of the player off
+# the board through different directions count as different moves although they lead to the same state.
+PERFT_COUNTS = {
+    "classic": [1, 74, 5476, 399896, 29202374],
+    "alien": [1, 54, 2952, 161078, 8885756],
+    "simplified": [1, 18, 324, 5832, 104931],
+}
+
+
+def perft(state: SearchStateAbalone, depth: int) -> int:
+    """
+    Counts the move sequences of a length from a state with the moves of BitBoardAbalone,
+    played and taken back in place. Sequences are cut at the end of the game.
+
+    Args:
+        state (SearchStateAbalone): The state
+        depth (int): Length of the sequences
+
+    Returns:
+        int: Number of sequences
+    """
+    if depth == 0:
+        return 1
+    if state.is_done():
+        return 0
+    moves = state.generate_moves()
+    if depth == 1:
+        return len(moves)
+    count = 0
+    for move in moves:
+        state.apply(move)
+        count += perft(state, depth - 1)
+        state.undo(move)
+    return count
+
+
+def perft_legacy(state: GameStateAbalone, depth: int) -> int:
+    """
+    Counts the move sequences of a length from a state with GameStateAbalone.generator,
+    building the next states as GameStateAbalone.generate_possible_actions does.
+    Sequences are cut at the end of the game.
+
+    Args:
+        state (GameStateAbalone): The state
+        depth (int): Length of the sequences
+
+    Returns:
+        int: Number of sequences
+    """
+    if depth == 0:
+        return 1
+    if state.is_done():
+        return 0
+    if depth == 1:
+        return sum(1 for _ in state.generator())
+    count = 0
+    next_player = state.compute_next_player()
+    for rep, id_add in state.generator():
+        next_state = GameStateAbalone(
+            state.compute_scores(id_add=id_add), next_player, state.players, rep, step=state.step + 1
+        )
+        count += perft_legacy(next_state, depth - 1)
+    return count
+
+
+def divide(state: SearchStateAbalone, depth: int) -> Dict[str, int]:
+    """
+    Counts the move sequences of a length starting with each move of a state, to locate a wrong count.
+
+    Args:
+        state (SearchStateAbalone): The state
+        depth (int): Length of the sequences, at least 1
+
+    Returns:
+        Dict[str, int]: Number of sequences after each move, named by move_to_str.
+            The moves leading to the same state are named after the first one and their counts summed,
+            so that the result is the same as the one of divide_legacy
+    """
+    counts = Counter()
+    for move in state.generate_moves():
+        state.apply(move)
+        masks = list(state.board.masks)
+        count = perft(state, depth - 1)
+        state.undo(move)
+        counts[move_to_str(state.board.find_move(masks, state.next_side))] += count
+    return dict(counts)
+
+
+def divide_legacy(state: GameStateAbalone, depth: int) -> Dict[str, int]:
+    """
+    Counts the move sequences of a length starting with each move of a state with GameStateAbalone.generator.
+
+    Args:
+        state (GameStateAbalone): The state
+        depth (int): Length of the sequences, at least 1
+
+    Returns:
+        Dict[str, int]: Number of sequences after each move, named as in divide
+    """
+    search_state = state.get_search_state()
+    counts = Counter()
+    next_player = state.compute_next_player()
+    for rep, id_add in state.generator():
+        next_state = GameStateAbalone(
+            state.compute_scores(id_add=id_add), next_player, state.players, rep, step=state.step + 1
+        )
+        masks = next_state.get_search_state().board.masks
+        counts[move_to_str(search_state.board.find_move(masks, search_state.next_side))] += perft_legacy(
+            next_state, depth - 1
+        )
+    return dict(counts)
+
+
+def run_perft(config: str, depth: int, legacy: bool = False) -> Dict[str, Any]:
+    """
+    Times perft from a starting layout and checks the count against PERFT_COUNTS.
+
+    Args:
+        config (str): Starting layout, "classic", "alien" or "simplified"
+        depth (int): Length of the sequences
+        legacy (bool): Whether to use GameStateAbalone.generator instead of BitBoardAbalone
+
+    Returns:
+        Dict[str, Any]: "config", "depth", "generator", "count", "expected" (None if unknown), "time" in seconds
+            and "leaves_per_second"
+    """
+    state = create_initial_game_state(PlayerAbalone("W", "W"), PlayerAbalone("B", "B"), config)
+    count_function: Callable[[Any, int], int] = perft_legacy if legacy else perft
+    root = state if legacy else state.get_search_state()
+    start = perf_counter()
+    count = count_function(root, depth)
+    elapsed = perf_counter() - start
+    expected = PERFT_COUNTS[config]
+    return {
+        "config": config,
+        "depth": depth,
+        "generator": "legacy" if legacy else "bitboard",
+        "count": count,
+        "expected": expected[depth] if depth < len(expected) else None,
+        "time": elapsed,
+        "leaves_per_second": count / elapsed if elapsed > 0 else None,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="perft_abalone.py",
+        description="Counts the move sequences from the starting layouts to check and time the move generation.",
+    )
+    parser.add_argument("-d", "--depth", type=int, default=3, help="Length of the move sequences.")
+    parser.add_argument("-c", "--config", nargs="+", choices=list(LAYOUTS), default=list(LAYOUTS), help="Starting layouts.")
+    parser.add_argument("--legacy", action="store_true", help="Uses GameStateAbalone.generator.")
+    parser.add_argument("--divide", action="store_true", help="Prints the count after each first move.")
+    args = parser.parse_args()
+
+    failed = False
+    for config in args.config:
+        if args.divide:
+            state = create_initial_game_state(PlayerAbalone("W", "W"), PlayerAbalone("B", "B"), config)
+            counts = divide_legacy(state, args.depth) if args.legacy else divide(state.get_search_state(), args.depth)
+            for move, count in sorted(counts.items()):
+                print(f"{config} {move}: {count}")
+        result = run_perft(config, args.depth, args.legacy)
+        print(json.dumps(result), flush=True)
+        failed |= result["expected"] is not None and result["count"] != result["expected"]
+    if failed:
+        raise SystemExit("perft count differs from PERFT_COUNTS")
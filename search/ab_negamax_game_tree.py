@@ -1,15 +1,14 @@
-from utils import compute_terminal_state_score, compute_normalized_distances_to_center, push_happened
-from keys import STATE, ACTION, SCORE, CHILDREN, ALPHA, BETA, TURN, NEXT, DEPTH, PLAYER
+from utils import search_state_terminal_score
+from keys import SCORE, DEPTH, PLAYER
+from bitboard_abalone import MOVE_OPP_MASK, ZOBRIST_ENDGAME_KEY
 from math import inf
-import time
 
 def lookup_score(state, depth, table):
     endgame = state.step + depth > state.max_step
-    table_key = (str(state.rep), endgame)
+    table_key = state.hash ^ ZOBRIST_ENDGAME_KEY if endgame else state.hash
     lookup_result = table.get(table_key)
     if lookup_result is not None and lookup_result[DEPTH] >= depth:
-        score = lookup_result[SCORE] if lookup_result[PLAYER] == state.get_next_player() else -lookup_result[SCORE]
-        state.get_next_player().increment_successful_lookups()
+        score = lookup_result[SCORE] if lookup_result[PLAYER] == state.next_side else -lookup_result[SCORE]
         return table_key, score
     return table_key, None
 
@@ -20,10 +19,14 @@ def compute_state_score(
         heuristic,
         table,
         quiescence_test,
-        previous_state,
+        previous_move=None,
         quiescence_search_depth=1,
         alpha=-inf,
         beta=inf):
+    """
+    Negamax with alpha-beta pruning and transposition table on a SearchStateAbalone,
+    the moves are played and taken back in place with apply / undo
+    """
 
     # Lookup in transposition table
     table_key, lookup_result = lookup_score(state, depth, table)
@@ -31,45 +34,44 @@ def compute_state_score(
         score = lookup_result
     elif state.is_done():
         # Terminal state
-        score = compute_terminal_state_score(
-            state)
+        score = search_state_terminal_score(state)
         depth = inf
     elif depth == 0:
         # Non-terminal state at max depth
         # use quiescence search if a piece was just pushed
-        if quiescence_test and push_happened(state, previous_state):
+        # it searches this same node for the same player, so it keeps the window of the node, not the negated one
+        if quiescence_test and previous_move is not None and previous_move & MOVE_OPP_MASK:
             score = compute_state_score(
                     state=state,
                     depth=quiescence_search_depth,
                     heuristic=heuristic,
                     table=table,
-                    previous_state=previous_state,
                     quiescence_test=False,
                     quiescence_search_depth=quiescence_search_depth,
-                    alpha=-beta,
-                    beta=-alpha)
+                    alpha=alpha,
+                    beta=beta)
         else:
             score = heuristic(state)
     else:
         # Non-terminal state at non-max depth
         score = -inf
-        children = state.get_possible_actions()
-        for child in children:
+        for move in state.generate_moves():
+            state.apply(move)
             child_score = compute_state_score(
-                    state=child.get_next_game_state(),
+                    state=state,
                     depth=depth-1,
                     heuristic=heuristic,
                     table=table,
-                    previous_state=state,
+                    previous_move=move,
                     quiescence_test=quiescence_test,
                     quiescence_search_depth=quiescence_search_depth,
                     alpha=-beta,
                     beta=-alpha
                 )
+            state.undo(move)
             score = max(score, -child_score)
             alpha = max(alpha, score)
             if alpha >= beta:
-                state.get_next_player().increment_cutoffs()
                 break
 
     
@@ -77,7 +79,7 @@ def compute_state_score(
     table[table_key] = {
         SCORE: score,
         DEPTH: depth,
-        PLAYER: state.get_next_player()
+        PLAYER: state.next_side
     }
 
     return score
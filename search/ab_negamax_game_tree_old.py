@@ -1,6 +1,8 @@
 from utils import compute_terminal_state_score, compute_normalized_distances_to_center
 from keys import STATE, ACTION, SCORE, CHILDREN, ALPHA, BETA, TURN, NEXT, DEPTH
 from math import inf
+from typing import Optional
+from search_stats import SearchStats
 
 
 def create_game_tree(state, action=None):
@@ -32,19 +34,24 @@ def expand(game_tree):
     return game_tree
 
 
-def compute_score(*, game_tree, depth=0, heuristic, table):
+def compute_score(*, game_tree, depth=0, heuristic, table, stats: Optional[SearchStats] = None):
     """
     Computes the score of the game tree by expanding it completely
     and then computing the score of each node from the bottom up
     using the negamax algorithm
+    the nodes, the lookups in the table, the evaluations and the cutoffs are counted in stats if given
     """
     endgame = game_tree[STATE].step + depth >= game_tree[STATE].max_step
     rep = game_tree[STATE].rep
     table_key = (rep, endgame)
     lookup_result = table.get(table_key)
+    if stats is not None:
+        stats.nodes += 1
+        stats.nodes_by_depth[depth] += 1
+        stats.tt_probes += 1
+        stats.tt_hits += lookup_result is not None and lookup_result[DEPTH] >= depth
     if lookup_result is not None and lookup_result[DEPTH] >= depth:
         score = lookup_result[SCORE]
-        game_tree[STATE].get_next_player().increment_successful_lookups()
         # game_tree[NEXT] = lookup_result[NEXT]
         return score
     elif game_tree[STATE].is_done():
@@ -55,6 +62,8 @@ def compute_score(*, game_tree, depth=0, heuristic, table):
     elif depth == 0:
         # heuristic evaluates from next player (opponent) perspective
         score = - heuristic(game_tree)
+        if stats is not None:
+            stats.leaf_evaluations += 1
     else:
         expand(game_tree)
         score = -inf
@@ -62,14 +71,16 @@ def compute_score(*, game_tree, depth=0, heuristic, table):
             game_tree[CHILDREN].values(),
             key=heuristic,
             reverse=True)
-        for child in children:
+        for index, child in enumerate(children):
             child[ALPHA] = -game_tree[BETA]
             child[BETA] = -game_tree[ALPHA]
-            child_score = compute_score(game_tree=child, depth=depth-1, heuristic=heuristic, table=table)
+            child_score = compute_score(game_tree=child, depth=depth-1, heuristic=heuristic, table=table, stats=stats)
             score = max(score, -child_score)
             game_tree[ALPHA] = max(game_tree[ALPHA], score)
             if game_tree[ALPHA] >= game_tree[BETA]:
-                game_tree[STATE].get_next_player().increment_cutoffs()
+                if stats is not None:
+                    stats.cutoffs += 1
+                    stats.cutoffs_by_move_index[index] += 1
                 break
 
     table[table_key] = {
@@ -77,5 +88,7 @@ def compute_score(*, game_tree, depth=0, heuristic, table):
         # NEXT: game_tree[NEXT],
         DEPTH: depth,
     }
+    if stats is not None:
+        stats.tt_stores += 1
 
     return score
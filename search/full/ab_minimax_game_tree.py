@@ -2,6 +2,8 @@
 import math
 from utils import compute_terminal_state_score
 from keys import STATE, ACTION, DEPTH, SCORE, CHILDREN, ALPHA, BETA, NEXT
+from typing import Optional
+from search_stats import SearchStats
 
 
 def create_game_tree(state,  action=None, depth=0):
@@ -40,7 +42,8 @@ def compute_score(*,
                   max_player,
                   min_player,
                   heuristic=None,
-                  table=None
+                  table=None,
+                  stats: Optional[SearchStats] = None
                   ):
     """
     Computes the score of the game tree by expanding it completely
@@ -48,6 +51,7 @@ def compute_score(*,
     using the minimax algorithm with alpha-beta pruning
     pruned nodes will have their score set to None
     children are sorted according to a heuristic to improve pruning
+    the nodes, the lookups in the table and the cutoffs are counted in stats if given
     """
     expand(game_tree)
     if game_tree[SCORE] is not None:
@@ -59,13 +63,16 @@ def compute_score(*,
         player_id = game_tree[STATE].next_player.get_id()
         table_key = (rep, player_id, game_tree[DEPTH])
         table_result = table.get(table_key)
+        if stats is not None:
+            stats.tt_probes += 1
+            stats.tt_hits += table_result is not None
         if table_result is not None:
-            game_tree[STATE].get_next_player().increment_successful_lookups()
             game_tree[SCORE] = table_result[SCORE]
             game_tree[NEXT] = table_result[NEXT]
             return game_tree[SCORE]
 
-    game_tree[STATE].get_next_player().increment_computed_nodes()
+    if stats is not None:
+        stats.nodes += 1
 
     if game_tree[STATE].is_done():
         game_tree[SCORE] = compute_terminal_state_score(
@@ -78,7 +85,7 @@ def compute_score(*,
         children = game_tree[CHILDREN].values()
         if heuristic is not None:
             children = sorted(children, key=heuristic, reverse=True)
-        for child in children:
+        for index, child in enumerate(children):
             # propagate alpha and beta values to child
             child[ALPHA] = game_tree[ALPHA]
             child[BETA] = game_tree[BETA]
@@ -87,11 +94,14 @@ def compute_score(*,
                 max_player=max_player,
                 min_player=min_player,
                 heuristic=heuristic,
-                table=table)
+                table=table,
+                stats=stats)
             game_tree[SCORE] = max(game_tree[SCORE], child[SCORE])
             game_tree[ALPHA] = max(game_tree[ALPHA], game_tree[SCORE])
             if game_tree[ALPHA] >= game_tree[BETA]:
-                game_tree[STATE].get_next_player().increment_cutoffs()
+                if stats is not None:
+                    stats.cutoffs += 1
+                    stats.cutoffs_by_move_index[index] += 1
                 break
     else:  # if game_tree[STATE].next_player == min_player:
         game_tree[SCORE] = math.inf
@@ -99,7 +109,7 @@ def compute_score(*,
         if heuristic is not None:
             children = sorted(
                 children, key=heuristic)
-        for child in children:
+        for index, child in enumerate(children):
             # propagate alpha and beta values to child
             child[ALPHA] = game_tree[ALPHA]
             child[BETA] = game_tree[BETA]
@@ -108,11 +118,14 @@ def compute_score(*,
                 max_player=max_player,
                 min_player=min_player,
                 heuristic=heuristic,
-                table=table)
+                table=table,
+                stats=stats)
             game_tree[SCORE] = min(game_tree[SCORE], child[SCORE])
             game_tree[BETA] = min(game_tree[BETA], game_tree[SCORE])
             if game_tree[ALPHA] >= game_tree[BETA]:
-                game_tree[STATE].get_next_player().increment_cutoffs()
+                if stats is not None:
+                    stats.cutoffs += 1
+                    stats.cutoffs_by_move_index[index] += 1
                 break
 
     if table is not None:
@@ -120,4 +133,6 @@ def compute_score(*,
             SCORE: game_tree[SCORE],
             NEXT: game_tree[NEXT]
         }
+        if stats is not None:
+            stats.tt_stores += 1
     return game_tree[SCORE]
@@ -1,6 +1,8 @@
 from utils import compute_terminal_state_score, compute_normalized_distances_to_center
 from keys import STATE, ACTION, SCORE, CHILDREN, ALPHA, BETA, DEPTH, NEXT
 from math import inf
+from typing import Optional
+from search_stats import SearchStats
 
 
 def create_game_tree(state, depth=0, action=None):
@@ -34,11 +36,14 @@ def expand(game_tree):
     return game_tree
 
 
-def compute_score(game_tree, heuristic=None, table=None):
+def compute_score(game_tree, heuristic=None, table=None, batch_heuristic=None, stats: Optional[SearchStats] = None):
     """
     Computes the score of the game tree by expanding it completely
     and then computing the score of each node from the bottom up
     using the negamax algorithm
+    the children are sorted with batch_heuristic if given,
+    which evaluates a list of states in one call, else with heuristic
+    the nodes, the lookups in the table and the cutoffs are counted in stats if given
     """
     expand(game_tree)
     if game_tree[SCORE] is not None:
@@ -48,13 +53,16 @@ def compute_score(game_tree, heuristic=None, table=None):
         rep = game_tree[STATE].rep
         table_key = (rep, game_tree[DEPTH])
         lookup_result = table.get(table_key)
+        if stats is not None:
+            stats.tt_probes += 1
+            stats.tt_hits += lookup_result is not None
         if lookup_result is not None:
-            game_tree[STATE].get_next_player().increment_successful_lookups()
             game_tree[SCORE] = lookup_result[SCORE]
             game_tree[NEXT] = lookup_result[NEXT]
             return game_tree[SCORE]
 
-    game_tree[STATE].get_next_player().increment_computed_nodes()
+    if stats is not None:
+        stats.nodes += 1
 
     if game_tree[STATE].is_done():
         game_tree[SCORE] = compute_terminal_state_score(
@@ -64,19 +72,28 @@ def compute_score(game_tree, heuristic=None, table=None):
 
     game_tree[SCORE] = -inf
     children = game_tree[CHILDREN].values()
-    if heuristic is not None:
+    if batch_heuristic is not None:
+        children = list(children)
+        values = batch_heuristic([child[STATE] for child in children])
+        children = [children[index] for index in sorted(
+            range(len(children)),
+            key=values.__getitem__,
+            reverse=True)]
+    elif heuristic is not None:
         children = sorted(
             game_tree[CHILDREN].values(),
             key=heuristic,
             reverse=True)
-    for child in children:
+    for index, child in enumerate(children):
         child[ALPHA] = -game_tree[BETA]
         child[BETA] = -game_tree[ALPHA]
-        compute_score(child, heuristic, table)
+        compute_score(child, heuristic, table, batch_heuristic, stats)
         game_tree[SCORE] = max(game_tree[SCORE], -child[SCORE])
         game_tree[ALPHA] = max(game_tree[ALPHA], game_tree[SCORE])
         if game_tree[ALPHA] >= game_tree[BETA]:
-            game_tree[STATE].get_next_player().increment_cutoffs()
+            if stats is not None:
+                stats.cutoffs += 1
+                stats.cutoffs_by_move_index[index] += 1
             break
 
     if table is not None:
@@ -84,5 +101,7 @@ def compute_score(game_tree, heuristic=None, table=None):
             SCORE: game_tree[SCORE],
             NEXT: game_tree[NEXT],
         }
+        if stats is not None:
+            stats.tt_stores += 1
 
     return game_tree[SCORE]
@@ -1,6 +1,8 @@
 import math
 from utils import compute_terminal_state_score
 from keys import STATE, ACTION, SCORE, CHILDREN
+from typing import Optional
+from search_stats import SearchStats
 
 
 def create_game_tree(state, action=None):
@@ -29,17 +31,19 @@ def expand(game_tree):
     return game_tree
 
 
-def compute_score(game_tree, max_player, min_player):
+def compute_score(game_tree, max_player, min_player, stats: Optional[SearchStats] = None):
     """
     Computes the score of the game tree by expanding it completely
     and then computing the score of each node from the bottom up
     using the minimax algorithm
+    the nodes are counted in stats if given
     """
     expand(game_tree)
     if game_tree[SCORE] is not None:
         return
 
-    game_tree[STATE].get_next_player().increment_computed_nodes()
+    if stats is not None:
+        stats.nodes += 1
 
     if game_tree[STATE].is_done():
         game_tree[SCORE] = compute_terminal_state_score(
@@ -50,13 +54,13 @@ def compute_score(game_tree, max_player, min_player):
     if game_tree[STATE].next_player == max_player:
         game_tree[SCORE] = -math.inf
         for child in game_tree[CHILDREN].values():
-            compute_score(child, max_player, min_player)
+            compute_score(child, max_player, min_player, stats)
             game_tree[SCORE] = max(game_tree[SCORE], child[SCORE])
         return
 
     if game_tree[STATE].next_player == min_player:
         game_tree[SCORE] = math.inf
         for child in game_tree[CHILDREN].values():
-            compute_score(child, max_player, min_player)
+            compute_score(child, max_player, min_player, stats)
             game_tree[SCORE] = min(game_tree[SCORE], child[SCORE])
         return
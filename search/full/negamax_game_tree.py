@@ -1,6 +1,8 @@
 from utils import compute_terminal_state_score
 from keys import STATE, ACTION, SCORE, CHILDREN
 from math import inf
+from typing import Optional
+from search_stats import SearchStats
 
 
 def create_game_tree(state, action=None):
@@ -29,17 +31,19 @@ def expand(game_tree):
     return game_tree
 
 
-def compute_score(game_tree):
+def compute_score(game_tree, stats: Optional[SearchStats] = None):
     """
     Computes the score of the game tree by expanding it completely
     and then computing the score of each node from the bottom up
     using the negamax algorithm
+    the nodes are counted in stats if given
     """
     expand(game_tree)
     if game_tree[SCORE] is not None:
         return game_tree[SCORE]
 
-    game_tree[STATE].get_next_player().increment_computed_nodes()
+    if stats is not None:
+        stats.nodes += 1
 
     if game_tree[STATE].is_done():
         game_tree[SCORE] = compute_terminal_state_score(
@@ -49,7 +53,7 @@ def compute_score(game_tree):
 
     game_tree[SCORE] = -inf
     for child in game_tree[CHILDREN].values():
-        compute_score(child)
+        compute_score(child, stats)
         game_tree[SCORE] = max(game_tree[SCORE], -child[SCORE])
 
     return game_tree[SCORE]
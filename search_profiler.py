@@ -0,0 +1,226 @@
+import json
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterable
+
+# Methods timed in each phase of the search by SearchProfiler.instrument_search
+STATE_METHODS = ("apply", "undo", "apply_null", "undo_null")
+CONVERSION_METHODS = ("to_action",)
+BOARD_METHODS = ("generate_pushes", "generate_quiet_moves", "generate_tactical_moves", "is_legal_move")
+TABLE_METHODS = ("probe", "store")
+ORDERER_METHODS = ("score_move",)
+
+APPLY_UNDO = "apply / undo"
+MOVE_GENERATION = "move generation"
+MOVE_ORDERING = "move ordering"
+EVALUATION = "evaluation"
+TRANSPOSITION_TABLE = "transposition table"
+STATE_CONVERSION = "state conversion"
+
+
+class PhaseRecord:
+    """
+    Calls of a timed function during a move.
+
+    Attributes:
+        calls (int): Number of calls.
+        sampled_calls (int): Number of calls that were timed.
+        sampled_time (float): Time spent in the calls that were timed, in seconds.
+    """
+
+    __slots__ = ("calls", "sampled_calls", "sampled_time")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.sampled_calls = 0
+        self.sampled_time = 0.0
+
+    def estimate_time(self) -> float:
+        """
+        Extrapolates the time of the timed calls to all the calls.
+
+        Returns:
+            float: Estimated time spent in the function, in seconds
+        """
+        return self.sampled_time * self.calls / self.sampled_calls if self.sampled_calls else 0.0
+
+
+class TimedCall:
+    """
+    Wraps a function to count its calls in a PhaseRecord and time one call out of sample_every with perf_counter,
+    as timing every call of the small functions of the search would cost more than the functions themselves.
+    """
+
+    __slots__ = ("function", "record", "sample_every")
+
+    def __init__(self, function: Callable, record: PhaseRecord, sample_every: int) -> None:
+        self.function = function
+        self.record = record
+        self.sample_every = sample_every
+
+    def __call__(self, *args, **kwargs):
+        record = self.record
+        calls = record.calls
+        record.calls = calls + 1
+        if calls % self.sample_every:
+            return self.function(*args, **kwargs)
+        start = perf_counter()
+        try:
+            return self.function(*args, **kwargs)
+        finally:
+            record.sampled_time += perf_counter() - start
+            record.sampled_calls += 1
+
+
+class SearchProfiler:
+    """
+    Breaks down the time of each move of MyPlayer into the phases of the search:
+    move generation, move ordering, evaluation by the heuristic, transposition table, apply / undo
+    and conversion of the chosen move to an action. The rest of the time of the move, "other",
+    is spent in the search itself: alpha-beta bookkeeping, quiescence tests and the calls between the phases.
+
+    The phases are timed by replacing the methods of the objects of the search of a move with TimedCall instances,
+    so the search doesn't know about the profiler and a player that doesn't profile pays nothing.
+    A player that profiles searches less deep in the same time, the calls of the wrappers being counted in "other".
+    Only the search of the player process is timed, not the ones of the worker processes of the parallel searches.
+
+    Attributes:
+        sample_every (int): One call out of sample_every of each function is timed, the first one included.
+        moves (List[Dict[str, Any]]): Breakdown of each move of the game, as returned by end_move.
+    """
+
+    def __init__(self, sample_every: int = 10) -> None:
+        self.sample_every = sample_every
+        self.moves = []
+        self.records = {}
+        # objects and names of the methods replaced for the current move
+        self.instrumented = []
+        self.step = None
+        self.start = None
+
+    def start_move(self, step: int) -> None:
+        """
+        Starts timing a move.
+
+        Args:
+            step (int): Step of the game of the move
+        """
+        self.records = {}
+        self.step = step
+        self.start = perf_counter()
+
+    def time_function(self, phase: str, name: str, function: Callable) -> TimedCall:
+        """
+        Wraps a function to count its time in a phase of the current move.
+
+        Args:
+            phase (str): Phase of the search
+            name (str): Name of the function
+            function (Callable): The function
+
+        Returns:
+            TimedCall: The wrapped function
+        """
+        record = self.records.setdefault((phase, name), PhaseRecord())
+        return TimedCall(function, record, self.sample_every)
+
+    def instrument(self, obj: Any, phase: str, names: Iterable[str]) -> None:
+        """
+        Replaces methods of an object with timed versions until the end of the current move.
+
+        Args:
+            obj (Any): The object
+            phase (str): Phase of the search the methods belong to
+            names (Iterable[str]): Names of the methods
+        """
+        for name in names:
+            method = getattr(type(obj), name).__get__(obj)
+            setattr(obj, name, self.time_function(phase, name, method))
+            self.instrumented.append((obj, name))
+
+    def instrument_search(self, state, table, orderer, heuristic: Callable) -> TimedCall:
+        """
+        Times the phases of the search of the current move.
+
+        Args:
+            state (SearchStateAbalone): Root of the search, with its board
+            table (TranspositionTable): Transposition table of the search
+            orderer (Optional[MoveOrderer]): Move ordering of the search
+            heuristic (Callable): Heuristic of the search
+
+        Returns:
+            TimedCall: The heuristic to search with
+        """
+        self.instrument(state, APPLY_UNDO, STATE_METHODS)
+        self.instrument(state, STATE_CONVERSION, CONVERSION_METHODS)
+        self.instrument(state.board, MOVE_GENERATION, BOARD_METHODS)
+        self.instrument(table, TRANSPOSITION_TABLE, TABLE_METHODS)
+        if orderer is not None:
+            self.instrument(orderer, MOVE_ORDERING, ORDERER_METHODS)
+        return self.time_function(EVALUATION, "heuristic", heuristic)
+
+    def restore(self) -> None:
+        """
+        Gives back their own methods to the objects of the search of the current move.
+        Does nothing if they already have them, so it can be called whether the search ended normally or not.
+        """
+        for obj, name in self.instrumented:
+            delattr(obj, name)
+        self.instrumented = []
+
+    def end_move(self) -> Dict[str, Any]:
+        """
+        Stops timing the current move and gives back their own methods to the objects of its search.
+
+        Returns:
+            Dict[str, Any]: "step", "time" of the move in seconds, estimated "phases" time and "calls" of each phase,
+                and the "other" time of the move
+        """
+        time = perf_counter() - self.start
+        self.restore()
+        phases = {}
+        calls = {}
+        for (phase, _), record in self.records.items():
+            phases[phase] = phases.get(phase, 0.0) + record.estimate_time()
+            calls[phase] = calls.get(phase, 0) + record.calls
+        move = {
+            "step": self.step,
+            "time": time,
+            "phases": phases,
+            "calls": calls,
+            "other": time - sum(phases.values()),
+        }
+        self.moves.append(move)
+        return move
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Sums the breakdowns of the moves of the game.
+
+        Returns:
+            Dict[str, Any]: "sample_every", "moves" breakdowns and "total" breakdown of the game,
+                with the "shares" of the time of the game spent in each phase
+        """
+        total = {"time": 0.0, "phases": {}, "calls": {}, "other": 0.0}
+        for move in self.moves:
+            total["time"] += move["time"]
+            total["other"] += move["other"]
+            for phase, time in move["phases"].items():
+                total["phases"][phase] = total["phases"].get(phase, 0.0) + time
+            for phase, calls in move["calls"].items():
+                total["calls"][phase] = total["calls"].get(phase, 0) + calls
+        total["shares"] = {
+            phase: time / total["time"] if total["time"] > 0 else None
+            for phase, time in dict(total["phases"], other=total["other"]).items()
+        }
+        return {"sample_every": self.sample_every, "moves": list(self.moves), "total": total}
+
+    def write_report(self, path: str, **context: Any) -> None:
+        """
+        Writes the breakdown of the game so far to a JSON file, replacing the previous one.
+
+        Args:
+            path (str): The file
+            **context: Other fields of the report, such as the name of the player
+        """
+        with open(path, "w") as file:
+            json.dump({**context, **self.report()}, file, indent=2)
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, List, Optional
+
+from bitboard_abalone import ZOBRIST_SIDE_KEYS, BitBoardAbalone, Move
+from constants import MAX_SCORE, MAX_STEP
+from evaluator_abalone import IncrementalEvaluator
+from seahorse.game.action import Action
+
+if TYPE_CHECKING:
+    from game_state_abalone import GameStateAbalone
+
+
+class SearchStateAbalone:
+    """
+    A mutable game state for in-place search.
+    Moves are played with apply and taken back with undo instead of building a new state per edge.
+
+    Attributes:
+        board (BitBoardAbalone): Pieces of both players.
+        scores (List[int]): Score of each player, in the order of the players of the game.
+        step (int): Current step of the game.
+        next_side (int): Index of the next player to play.
+        max_step (int): Step at which the game ends.
+        max_score (int): Score at which the game ends.
+        hash (int): Zobrist hash of the pieces and of the next player, updated by apply / undo.
+        evaluator (Optional[IncrementalEvaluator]): Features of the pieces for the heuristics, updated by apply / undo if set.
+    """
+
+    def __init__(
+        self,
+        board: BitBoardAbalone,
+        scores: List[int],
+        step: int,
+        next_side: int,
+        max_step: int = MAX_STEP,
+        max_score: int = MAX_SCORE,
+        evaluator: Optional[IncrementalEvaluator] = None,
+    ) -> None:
+        self.board = board
+        self.scores = scores
+        self.step = step
+        self.next_side = next_side
+        self.max_step = max_step
+        self.max_score = max_score
+        self.hash = board.hash ^ ZOBRIST_SIDE_KEYS[next_side]
+        self.evaluator = evaluator
+
+    @classmethod
+    def from_game_state(cls, state: GameStateAbalone) -> SearchStateAbalone:
+        """
+        Builds the search state equivalent to a game state.
+
+        Args:
+            state (GameStateAbalone): Current game state representation
+
+        Returns:
+            SearchStateAbalone: The equivalent search state
+        """
+        players = state.get_players()
+        return cls(
+            board=BitBoardAbalone.from_board(state.get_rep(), players),
+            scores=[state.scores[player.get_id()] for player in players],
+            step=state.step,
+            next_side=players.index(state.get_next_player()),
+            max_step=state.max_step,
+            max_score=state.max_score,
+        )
+
+    def copy(self) -> SearchStateAbalone:
+        return SearchStateAbalone(
+            self.board.copy(),
+            list(self.scores),
+            self.step,
+            self.next_side,
+            self.max_step,
+            self.max_score,
+            self.evaluator.copy() if self.evaluator is not None else None,
+        )
+
+    def track_features(self) -> None:
+        """
+        Starts maintaining the features of the heuristics incrementally with an IncrementalEvaluator.
+        """
+        self.evaluator = IncrementalEvaluator(self.board)
+
+    def is_done(self) -> bool:
+        """
+        Check if the game is finished.
+
+        Returns:
+            bool: True if the game is finished, False otherwise.
+        """
+        return self.step == self.max_step or self.max_score in self.scores
+
+    def generate_moves(self) -> List[Move]:
+        return self.board.generate_moves(self.next_side)
+
+    def generate_tactical_moves(self) -> List[Move]:
+        return self.board.generate_tactical_moves(self.next_side)
+
+    def apply(self, move: Move) -> None:
+        """
+        Plays a move in place: updates the board, the scores, the step and the next player.
+
+        Args:
+            move (Move): The move to play
+        """
+        masks = self.board.masks
+        before = (masks[0], masks[1])
+        ejected = self.board.apply_move(move, self.next_side)
+        if self.evaluator is not None:
+            self.evaluator.update(0, before[0], masks[0])
+            self.evaluator.update(1, before[1], masks[1])
+        if ejected is not None:
+            self.scores[ejected] -= 1
+        self.step += 1
+        self.next_side ^= 1
+        self.hash = self.board.hash ^ ZOBRIST_SIDE_KEYS[self.next_side]
+
+    def undo(self, move: Move) -> None:
+        """
+        Takes back the last move played with apply, restoring the state exactly.
+
+        Args:
+            move (Move): The last move played
+        """
+        self.next_side ^= 1
+        self.step -= 1
+        masks = self.board.masks
+        before = (masks[0], masks[1])
+        ejected = self.board.undo_move(move, self.next_side)
+        if self.evaluator is not None:
+            self.evaluator.update(0, before[0], masks[0])
+            self.evaluator.update(1, before[1], masks[1])
+        if ejected is not None:
+            self.scores[ejected] += 1
+        self.hash = self.board.hash ^ ZOBRIST_SIDE_KEYS[self.next_side]
+
+    def apply_null(self) -> None:
+        """
+        Passes the turn of the next player in place, for null move pruning.
+        Passing is not a legal move of the game.
+        """
+        self.step += 1
+        self.next_side ^= 1
+        self.hash = self.board.hash ^ ZOBRIST_SIDE_KEYS[self.next_side]
+
+    def undo_null(self) -> None:
+        """
+        Takes back the last pass played with apply_null.
+        """
+        self.next_side ^= 1
+        self.step -= 1
+        self.hash = self.board.hash ^ ZOBRIST_SIDE_KEYS[self.next_side]
+
+    def to_action(self, move: Move, state: GameStateAbalone) -> Action:
+        """
+        Converts a move from this state to the equivalent seahorse action.
+
+        Args:
+            move (Move): The move
+            state (GameStateAbalone): The game state this search state was built from
+
+        Returns:
+            Action: The equivalent action
+        """
+        return state.convert_light_action_to_action(self.board.move_to_light_action(move))
+
+    def to_move(self, action: Action) -> Optional[Move]:
+        """
+        Converts a seahorse action played from this state to the equivalent move.
+
+        Args:
+            action (Action): The action, whose current state is equivalent to this search state
+
+        Returns:
+            Optional[Move]: The equivalent move, None if the action isn't a move of the next player.
+                Moves throwing a single piece of the player off the board through different directions
+                lead to the same state and can't be told apart, the first one generated is returned.
+        """
+        next_state = action.get_next_game_state()
+        board = BitBoardAbalone.from_board(next_state.get_rep(), next_state.get_players())
+        return self.board.find_move(board.masks, self.next_side)
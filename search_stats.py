@@ -0,0 +1,122 @@
+import json
+from collections import Counter
+from typing import Any, Dict, Optional
+
+
+class SearchStats:
+    """
+    Counters of a search, to compare search algorithms and settings and to see where the nodes of a move go.
+    The counters are plain integers updated inline by the search, cheap enough to stay on during games.
+
+    Attributes:
+        nodes (int): Number of nodes visited by the main search.
+        nodes_by_depth (Counter): Number of nodes visited by the main search, by remaining depth.
+        expanded_nodes (int): Number of nodes of the main search whose moves were searched.
+        moves_searched (int): Number of moves searched from the expanded nodes.
+        leaf_evaluations (int): Number of states evaluated by the heuristic, at depth 0 or as quiescence stand pat.
+        quiescence_nodes (int): Number of nodes visited by the quiescence search.
+        re_searches (int): Number of null window searches that failed high and were searched again.
+        aspiration_fail_lows (int): Number of root searches done again after failing low on the aspiration window.
+        aspiration_fail_highs (int): Number of root searches done again after failing high on the aspiration window.
+        null_move_cutoffs (int): Number of nodes cut off by null move pruning.
+        reductions (int): Number of late moves searched at reduced depth.
+        reduction_re_searches (int): Number of reduced late moves that beat alpha and were searched again at full depth.
+        tt_probes (int): Number of lookups in the transposition table.
+        tt_hits (int): Number of lookups that found an entry for the state.
+        tt_stores (int): Number of results stored in the transposition table.
+        cutoffs (int): Number of nodes of the main search whose moves were cut off by beta.
+        cutoffs_by_move_index (Counter): Number of cutoffs by index of the move causing them, 0 being the first move.
+        iterations (list): "depth", "time" in seconds and "nodes" of each iteration of the iterative deepening.
+    """
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Sets all the counters to zero before a new search.
+        """
+        self.nodes = 0
+        self.nodes_by_depth = Counter()
+        self.expanded_nodes = 0
+        self.moves_searched = 0
+        self.leaf_evaluations = 0
+        self.quiescence_nodes = 0
+        self.re_searches = 0
+        self.aspiration_fail_lows = 0
+        self.aspiration_fail_highs = 0
+        self.null_move_cutoffs = 0
+        self.reductions = 0
+        self.reduction_re_searches = 0
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.tt_stores = 0
+        self.cutoffs = 0
+        self.cutoffs_by_move_index = Counter()
+        self.iterations = []
+
+    def add(self, other: "SearchStats") -> None:
+        """
+        Adds the counters of another search, such as the search of a worker process.
+        The iterations of the other search are ignored, as they are timed by the search that adds them.
+
+        Args:
+            other (SearchStats): Counters of the other search
+        """
+        for name, value in vars(other).items():
+            if isinstance(value, Counter):
+                getattr(self, name).update(value)
+            elif not isinstance(value, list):
+                setattr(self, name, getattr(self, name) + value)
+
+    def record_iteration(self, depth: int, time: float) -> None:
+        """
+        Records an iteration of the iterative deepening that just completed, with the nodes it visited.
+
+        Args:
+            depth (int): Depth of the iteration
+            time (float): Duration of the iteration in seconds
+        """
+        previous_nodes = sum(iteration["nodes"] for iteration in self.iterations)
+        self.iterations.append({"depth": depth, "time": time, "nodes": self.nodes - previous_nodes})
+
+    @property
+    def branching_factor(self) -> Optional[float]:
+        """
+        Average number of moves searched from the expanded nodes, the effective branching factor after the cutoffs.
+        """
+        return self.moves_searched / self.expanded_nodes if self.expanded_nodes else None
+
+    @property
+    def tt_hit_rate(self) -> Optional[float]:
+        return self.tt_hits / self.tt_probes if self.tt_probes else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Gives the counters as a JSON serializable dict.
+
+        Returns:
+            Dict[str, Any]: The counters, with the keys of the counters by depth and by move index sorted,
+                and "branching_factor" and "tt_hit_rate"
+        """
+        result = {}
+        for name, value in vars(self).items():
+            if isinstance(value, Counter):
+                value = {key: value[key] for key in sorted(value)}
+            elif isinstance(value, list):
+                value = list(value)
+            result[name] = value
+        result["branching_factor"] = self.branching_factor
+        result["tt_hit_rate"] = self.tt_hit_rate
+        return result
+
+    def emit(self, path: str, **context: Any) -> None:
+        """
+        Appends the counters to a JSON lines file, one line per search.
+
+        Args:
+            path (str): The file
+            **context: Other fields of the line, such as the player and the step of the game
+        """
+        with open(path, "a") as file:
+            file.write(json.dumps({**context, **self.to_dict()}) + "\n")
@@ -0,0 +1,51 @@
+from math import inf
+
+from benchmark_abalone import load_positions, position_to_state
+from bitboard_abalone import MOVE_OPP_MASK
+from search.ab_negamax_game_tree import compute_state_score
+from utils import search_state_score_and_distance_sym
+
+
+def compute_leaf_score(state, move, alpha, beta):
+    """
+    Scores a leaf reached by a push, which the quiescence test searches one ply deeper.
+    """
+    return compute_state_score(
+        state=state,
+        depth=0,
+        heuristic=search_state_score_and_distance_sym,
+        table={},
+        quiescence_test=True,
+        previous_move=move,
+        quiescence_search_depth=1,
+        alpha=alpha,
+        beta=beta,
+    )
+
+
+def test_quiescence_respects_the_window_of_the_node():
+    # with a window, the score is exact inside of it and a bound on the same side outside of it
+    for position in load_positions():
+        state = position_to_state(position)
+        pushes = [move for move in state.generate_moves() if move & MOVE_OPP_MASK][:10]
+        for move in pushes:
+            state.apply(move)
+            if not state.is_done():
+                exact = compute_leaf_score(state, move, -inf, inf)
+                for center in (exact - 1, exact - 0.3, exact + 0.3, exact + 1):
+                    for half_width in (0.1, 0.5):
+                        alpha, beta = center - half_width, center + half_width
+                        score = compute_leaf_score(state, move, alpha, beta)
+                        if exact <= alpha:
+                            assert score <= alpha
+                        elif exact >= beta:
+                            assert score >= beta
+                        else:
+                            assert score == exact
+            state.undo(move)
+
+
+def test_heuristic_without_pieces():
+    state = next(position_to_state(position) for position in load_positions() if position["config"] == "simplified")
+    state.board.masks[1] = 0
+    assert search_state_score_and_distance_sym(state) is not None
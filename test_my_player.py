@@ -0,0 +1,53 @@
+from math import inf
+from time import perf_counter
+
+import pytest
+
+from benchmark_abalone import load_positions, position_to_state
+from move_ordering import MoveOrderer
+from my_player import PVS, compute_best_move_with_aspiration, score_distance_adjacency_sym
+from search_stats import SearchStats
+from transposition_table import TranspositionTable
+
+# Endgame positions of the benchmark corpus won or lost within 4 plies
+DECIDED_ENDGAMES = {"classic-endgame": inf, "alien-endgame": -inf, "simplified-endgame": inf}
+
+
+def search_position(name: str, depth: int, window):
+    """
+    Searches a position of the benchmark corpus by iterative deepening as MyPlayer does,
+    with a deadline so that a search that doesn't end fails the test instead of hanging it.
+    """
+    position = next(position for position in load_positions() if position["name"] == name)
+    state = position_to_state(position)
+    state.track_features()
+    table = TranspositionTable(16)
+    orderer = MoveOrderer()
+    stats = SearchStats()
+    deadline = perf_counter() + 60
+    best_move = None
+    score = None
+    for iteration in range(1, depth + 1):
+        best_move, score = compute_best_move_with_aspiration(
+            previous_score=score,
+            window=window,
+            algorithm=PVS,
+            stats=stats,
+            state=state,
+            depth=iteration,
+            heuristic=score_distance_adjacency_sym,
+            table=table,
+            quiescence_test=True,
+            first_move=best_move,
+            orderer=orderer,
+            deadline=deadline,
+        )
+    return best_move, score, stats
+
+
+@pytest.mark.parametrize("name", list(DECIDED_ENDGAMES))
+def test_aspiration_ends_on_decided_score(name):
+    _, score, stats = search_position(name, 4, window=1)
+    _, full_window_score, _ = search_position(name, 4, window=None)
+    assert score == full_window_score == DECIDED_ENDGAMES[name]
+    assert stats.aspiration_fail_lows + stats.aspiration_fail_highs < 10
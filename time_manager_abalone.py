@@ -0,0 +1,146 @@
+from math import inf
+from time import perf_counter
+from typing import Any, Dict, List, Optional
+
+from constants import MAX_STEP
+
+
+class TimeManagerAbalone:
+    """
+    Allots the time of the moves of a PlayerAbalone running an iterative deepening search.
+
+    The remaining time is split evenly between the moves left before max_step (soft limit).
+    The soft limit is extended when the opponent just pushed some pieces or when the score
+    changes a lot between iterations, and the search stops early when the best move is stable.
+    The hard limit is never extended and is the deadline given to the search itself.
+
+    Attributes:
+        max_step (int): Step at which the game ends.
+        margin (float): Time (s) kept aside from the clock for the overhead of the master.
+        push_factor (float): Extension of the soft limit after a push of the opponent.
+        volatility_threshold (float): Score change between two iterations considered volatile.
+        volatility_factor (float): Extension of the soft limit when the score is volatile.
+        max_factor (float): Hard limit, as a multiple of the even share of the remaining time.
+        stable_iterations (int): Number of iterations with the same best move to stop early.
+        stable_fraction (float): Fraction of the soft limit to spend before stopping early on a stable move.
+        decisions (List[Dict[str, Any]]): Decisions taken for each move, for logging.
+    """
+
+    def __init__(
+        self,
+        max_step: int = MAX_STEP,
+        margin: float = 1,
+        push_factor: float = 1.5,
+        volatility_threshold: float = 2,
+        volatility_factor: float = 1.5,
+        max_factor: float = 3,
+        stable_iterations: int = 3,
+        stable_fraction: float = 0.25,
+    ) -> None:
+        self.max_step = max_step
+        self.margin = margin
+        self.push_factor = push_factor
+        self.volatility_threshold = volatility_threshold
+        self.volatility_factor = volatility_factor
+        self.max_factor = max_factor
+        self.stable_iterations = stable_iterations
+        self.stable_fraction = stable_fraction
+        self.decisions: List[Dict[str, Any]] = []
+        self.start = 0
+        self.soft_limit = inf
+        self.hard_deadline = inf
+        self.best_moves = []
+        self.scores = []
+
+    def start_move(self, remaining_time: float, step: int, pushed: bool = False) -> float:
+        """
+        Allots the time of a new move.
+
+        Args:
+            remaining_time (float): Time (s) left on the clock of the player
+            step (int): Current step of the game
+            pushed (bool): Whether the opponent just pushed some pieces of the player
+
+        Returns:
+            float: perf_counter() value of the hard deadline of the search
+        """
+        self.start = perf_counter()
+        available = max(0, remaining_time - self.margin)
+        moves_left = max(1, (self.max_step - step + 1) // 2)
+        share = available / moves_left
+        self.soft_limit = share * self.push_factor if pushed else share
+        self.hard_deadline = self.start + min(share * self.max_factor, available)
+        self.best_moves = []
+        self.scores = []
+        self.decisions.append(
+            {
+                "step": step,
+                "remaining_time": remaining_time,
+                "moves_left": moves_left,
+                "share": share,
+                "soft_limit": self.soft_limit,
+                "hard_limit": self.hard_deadline - self.start,
+                "pushed": pushed,
+                "extensions": [],
+                "stop": None,
+                "depth": 0,
+                "elapsed": None,
+            }
+        )
+        return self.hard_deadline
+
+    def continue_search(self, depth: int, best_move: Any, score: float) -> bool:
+        """
+        Records a completed iteration and decides whether to start the next one.
+
+        Args:
+            depth (int): Depth of the completed iteration
+            best_move (Any): Best move found by the iteration
+            score (float): Score of the best move
+
+        Returns:
+            bool: True if the next iteration should be started
+        """
+        decision = self.decisions[-1]
+        decision["depth"] = depth
+        elapsed = perf_counter() - self.start
+
+        if self.scores and abs(score - self.scores[-1]) >= self.volatility_threshold:
+            self.soft_limit = min(
+                self.soft_limit * self.volatility_factor, self.hard_deadline - self.start
+            )
+            decision["extensions"].append(("volatile", depth, self.soft_limit))
+        self.best_moves.append(best_move)
+        self.scores.append(score)
+
+        stable = len(self.best_moves) >= self.stable_iterations and all(
+            move == best_move for move in self.best_moves[-self.stable_iterations:]
+        )
+        if stable and elapsed > self.soft_limit * self.stable_fraction:
+            decision["stop"] = "stable"
+            return False
+        # the next iteration is much longer than the previous ones, don't start it without enough time
+        if elapsed > self.soft_limit / 2:
+            decision["stop"] = "soft_limit"
+            return False
+        return True
+
+    def timeout(self) -> None:
+        """
+        Records that the search was interrupted by the hard deadline.
+        """
+        self.decisions[-1]["stop"] = "hard_limit"
+
+    def end_move(self) -> Dict[str, Any]:
+        """
+        Closes the decision record of the current move.
+
+        Returns:
+            Dict[str, Any]: The decisions taken for the move
+        """
+        decision = self.decisions[-1]
+        decision["elapsed"] = perf_counter() - self.start
+        return decision
+
+    def get_last_decision(self) -> Optional[Dict[str, Any]]:
+        return self.decisions[-1] if self.decisions else None
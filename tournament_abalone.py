@@ -0,0 +1,205 @@
+import argparse
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from os.path import abspath, basename, dirname, splitext
+from types import ModuleType
+from typing import Any, Dict, Iterator, List, Optional
+
+from loguru import logger
+from main_abalone import LAYOUTS, create_initial_game_state
+from master_abalone import compute_winner
+from seahorse.utils.custom_exceptions import SeahorseTimeoutError
+
+# Time credit of each player in a game in seconds, as in main_abalone
+DEFAULT_TIME_LIMIT = 15 * 60
+
+
+def load_player_module(path: str) -> ModuleType:
+    """
+    Imports the module of a player from its file, as main_abalone does.
+
+    Args:
+        path (str): File of the module, which defines a MyPlayer class
+
+    Returns:
+        ModuleType: The module
+    """
+    folder = dirname(abspath(path))
+    if folder not in sys.path:
+        sys.path.append(folder)
+    return __import__(splitext(basename(path))[0], fromlist=[None])
+
+
+def play_game(
+    player1_path: str,
+    player2_path: str,
+    config: str = "classic",
+    time_limit: float = DEFAULT_TIME_LIMIT,
+    search_workers: Optional[int] = 1,
+) -> Dict[str, Any]:
+    """
+    Plays a game between the MyPlayer classes of two modules without the GUI and the networking of MasterAbalone,
+    calling the players directly, with the same rules: the players are timed
+    and a player whose time runs out or who plays an action that isn't possible loses the game.
+    A game also ends when the next player has no action, which happens in the simplified layout
+    once a player lost all its pieces.
+    Seahorse keeps the timers of the players by object id for the lifetime of the process,
+    so each game must be played in a new process, as run_tournament does.
+
+    Args:
+        player1_path (str): File of the module of the first player, who plays first with the W pieces
+        player2_path (str): File of the module of the second player, who plays with the B pieces
+        config (str): Starting layout, "classic", "alien" or "simplified"
+        time_limit (float): Time credit of each player in seconds
+        search_workers (Optional[int]): Processes searching each move of the players that have a parallel search,
+            1 by default as the games of a tournament already share the cores. None keeps the setting of the players
+
+    Returns:
+        Dict[str, Any]: result of the game: "players" (files of the modules), "config",
+            "winner" (file of the module of the winner, None for a draw), "scores", "steps",
+            "remaining_times" of the players and "error" (None, "timeout" or "illegal action")
+    """
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    paths = [player1_path, player2_path]
+    players = [
+        load_player_module(path).MyPlayer(piece_type, name=splitext(basename(path))[0] + suffix, time_limit=time_limit)
+        for path, piece_type, suffix in zip(paths, ("W", "B"), ("_1", "_2"))
+    ]
+    if search_workers is not None:
+        for player in players:
+            if hasattr(player, "search_workers"):
+                player.search_workers = search_workers
+
+    state = create_initial_game_state(players[0], players[1], config)
+    error = None
+    while not state.is_done():
+        player = state.get_next_player()
+        possible_actions = state.get_possible_actions()
+        if not possible_actions:
+            break
+        player.start_timer()
+        try:
+            action = player.play(state)
+        except SeahorseTimeoutError:
+            action = None
+        remaining_time = player.stop_timer()
+        if action is None or remaining_time <= 0:
+            error = "timeout"
+        elif action not in possible_actions:
+            error = "illegal action"
+        if error is not None:
+            logger.error(f"{error} of player {player.get_name()}")
+            scores = dict(state.get_scores())
+            scores.pop(player.get_id())
+            break
+        state = action.get_next_game_state()
+    if error is None:
+        scores = state.get_scores()
+
+    for player in players:
+        if hasattr(player, "shutdown"):
+            player.shutdown()
+    winners = compute_winner(scores, state, players)
+    return {
+        "players": paths,
+        "config": config,
+        "winner": paths[players.index(winners[0])] if len(winners) == 1 else None,
+        "scores": [state.get_scores()[player.get_id()] for player in players],
+        "steps": state.step,
+        "remaining_times": [player.get_remaining_time() for player in players],
+        "error": error,
+    }
+
+
+def run_tournament(
+    player_paths: List[str],
+    games: int,
+    configs: List[str],
+    time_limit: float = DEFAULT_TIME_LIMIT,
+    workers: Optional[int] = None,
+    search_workers: Optional[int] = 1,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Plays games between two players across a process pool, each game in a new process.
+    The players swap colors from one game to the next.
+
+    Args:
+        player_paths (List[str]): Files of the modules of the two players
+        games (int): Number of games per starting layout
+        configs (List[str]): Starting layouts, among "classic", "alien" and "simplified"
+        time_limit (float): Time credit of each player in a game in seconds
+        workers (Optional[int]): Number of games played at the same time, the number of cores if None
+        search_workers (Optional[int]): Processes searching each move of the players, see play_game
+
+    Yields:
+        Dict[str, Any]: result of each game as returned by play_game, in the order the games end
+    """
+    with ProcessPoolExecutor(workers, max_tasks_per_child=1) as executor:
+        futures = [
+            executor.submit(
+                play_game,
+                *(player_paths if game % 2 == 0 else player_paths[::-1]),
+                config=config,
+                time_limit=time_limit,
+                search_workers=search_workers,
+            )
+            for config in configs
+            for game in range(games)
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def summarize(results: List[Dict[str, Any]], player_paths: List[str]) -> Dict[str, Any]:
+    """
+    Counts the wins of each player over the results of a tournament.
+
+    Args:
+        results (List[Dict[str, Any]]): Results of the games
+        player_paths (List[str]): Files of the modules of the players
+
+    Returns:
+        Dict[str, Any]: "games", "wins" of each player, "draws" and "errors" (games lost by timeout or illegal action)
+    """
+    return {
+        "games": len(results),
+        "wins": {path: sum(result["winner"] == path for result in results) for path in player_paths},
+        "draws": sum(result["winner"] is None for result in results),
+        "errors": sum(result["error"] is not None for result in results),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="tournament_abalone.py",
+        description="Plays games between two players without the GUI and the networking, several games at a time.",
+    )
+    parser.add_argument("players_list", nargs=2, help="The players")
+    parser.add_argument("-n", "--games", type=int, default=2, help="Number of games per starting layout.")
+    parser.add_argument(
+        "-c", "--config", nargs="+", choices=list(LAYOUTS), default=["classic"], help="Starting layouts."
+    )
+    parser.add_argument(
+        "-t", "--time-limit", type=float, default=DEFAULT_TIME_LIMIT, help="Time credit of each player in seconds."
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int, default=None, help="Number of games played at the same time, all the cores by default."
+    )
+    parser.add_argument("-o", "--output", default=None, help="JSON lines file receiving the result of each game.")
+    args = parser.parse_args()
+
+    results = []
+    output = open(args.output, "a") if args.output else None
+    try:
+        for result in run_tournament(args.players_list, args.games, args.config, args.time_limit, args.workers):
+            results.append(result)
+            print(json.dumps(result), flush=True)
+            if output is not None:
+                output.write(json.dumps(result) + "\n")
+                output.flush()
+    finally:
+        if output is not None:
+            output.close()
+    print(json.dumps(summarize(results, args.players_list), indent=2))
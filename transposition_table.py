@@ -0,0 +1,288 @@
+from array import array
+from math import inf
+from multiprocessing import shared_memory
+from struct import Struct
+from typing import Optional, Tuple
+
+from bitboard_abalone import Move
+
+# Bound types of the stored scores
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+# Depth stored for terminal states, deeper than any search
+MAX_DEPTH = 127
+
+# Bytes used by an entry: key, score, depth, bound, age and best move
+ENTRY_BYTES = 8 + 8 + 1 + 1 + 1 + 2
+
+# Stored in place of a missing best move, no move has no piece to move
+NO_MOVE = 0
+
+# An entry as returned by probe: (score, depth, bound, best move)
+Entry = Tuple[float, int, int, Optional[Move]]
+
+# Entry of the shared table: key ^ score bits ^ data, score and data packing the depth, bound, age and best move
+SHARED_ENTRY = Struct("=QdQ")
+SHARED_ENTRY_WORDS = Struct("=QQQ")
+SHARED_ENTRY_BYTES = SHARED_ENTRY.size
+SCORE_BITS = Struct("=Q")
+
+# Layout of the data word of the shared table, whose depth is offset to be positive
+DATA_MOVE_MASK = 0xFFFF
+DATA_DEPTH_SHIFT = 16
+DATA_BOUND_SHIFT = 24
+DATA_AGE_SHIFT = 26
+DEPTH_OFFSET = 128
+
+
+class TranspositionTable:
+    """
+    Fixed-size transposition table indexed by Zobrist hash.
+
+    Entries are grouped in buckets of two slots (two-tier replacement):
+    the first slot keeps the deepest entry of the current search,
+    the second slot always receives the entries that don't fit in the first one.
+    Entries are stored column-wise in typed arrays to keep them compact.
+
+    Attributes:
+        size (int): Number of entries of the table.
+        age (int): Age of the current search, entries of older searches are replaced first.
+        stores (int): Number of entries written since the table was created.
+    """
+
+    def __init__(self, memory_mb: float = 64) -> None:
+        """
+        Allocates the table.
+
+        Args:
+            memory_mb (float, optional): Memory budget of the table in MB
+        """
+        buckets = 1
+        while 2 * buckets * 2 * ENTRY_BYTES <= memory_mb * 1024 * 1024:
+            buckets *= 2
+        self.size = 2 * buckets
+        self.bucket_mask = buckets - 1
+        self.clear()
+
+    def clear(self) -> None:
+        """
+        Empties the table.
+        """
+        self.age = 0
+        self.stores = 0
+        self.keys = array("Q", bytes(8 * self.size))
+        self.scores = array("d", bytes(8 * self.size))
+        self.depths = array("b", [-1]) * self.size
+        self.bounds = array("b", bytes(self.size))
+        self.ages = array("B", bytes(self.size))
+        self.moves = array("H", bytes(2 * self.size))
+
+    def new_search(self) -> None:
+        """
+        Starts a new search: entries of the previous searches become replaceable.
+        """
+        self.age = (self.age + 1) & 0xFF
+
+    def probe(self, key: int) -> Optional[Entry]:
+        """
+        Looks up an entry.
+
+        Args:
+            key (int): Zobrist hash of the state
+
+        Returns:
+            Optional[Entry]: (score, depth, bound, best move) of the state if found
+        """
+        index = (key & self.bucket_mask) << 1
+        keys = self.keys
+        if keys[index] != key or self.depths[index] < 0:
+            index += 1
+            if keys[index] != key or self.depths[index] < 0:
+                return None
+        return self.scores[index], self.depths[index], self.bounds[index], self.moves[index] or None
+
+    def store(self, key: int, score: float, depth: float, bound: int, move: Optional[Move]) -> None:
+        """
+        Writes an entry, following the two-tier replacement policy.
+
+        Args:
+            key (int): Zobrist hash of the state
+            score (float): Score of the state for the next player
+            depth (float): Depth of the search that computed the score (inf for terminal states)
+            bound (int): EXACT, LOWER_BOUND or UPPER_BOUND
+            move (Optional[Move]): Best move found, if any
+        """
+        depth = MAX_DEPTH if depth == inf else depth
+        index = (key & self.bucket_mask) << 1
+        # The first slot keeps the deepest entry of the current search
+        if not (
+            self.keys[index] == key
+            or depth >= self.depths[index]
+            or self.ages[index] != self.age
+        ):
+            index += 1
+        if move is None:
+            move = self.moves[index] if self.keys[index] == key else NO_MOVE
+        self.keys[index] = key
+        self.scores[index] = score
+        self.depths[index] = depth
+        self.bounds[index] = bound
+        self.ages[index] = self.age
+        self.moves[index] = move
+        self.stores += 1
+
+    def __len__(self) -> int:
+        return sum(1 for depth in self.depths if depth >= 0)
+
+
+class SharedTranspositionTable:
+    """
+    Transposition table in a shared memory buffer, for the processes of a parallel search.
+    It has the interface and the two-tier replacement of TranspositionTable.
+
+    The processes access it without locks. An entry is three 64-bit words: the score,
+    the other fields packed in a data word and the key XOR the two others.
+    An entry torn by concurrent writes fails the XOR check and reads as missing instead of giving a wrong entry.
+    The age of the current search is stored after the entries so that all the processes share it.
+    The table is pickled as the name of its buffer, the processes unpickling it attach to the same buffer.
+
+    Attributes:
+        size (int): Number of entries of the table.
+        memory_mb (float): Memory budget of the table in MB.
+        name (str): Name of the shared memory buffer.
+        stores (int): Number of entries written by this process.
+    """
+
+    def __init__(self, memory_mb: float = 64, name: Optional[str] = None) -> None:
+        """
+        Allocates the table, or attaches to an existing one.
+
+        Args:
+            memory_mb (float, optional): Memory budget of the table in MB
+            name (Optional[str], optional): Name of the buffer of an existing table with the same budget
+        """
+        buckets = 1
+        while 2 * buckets * 2 * SHARED_ENTRY_BYTES <= memory_mb * 1024 * 1024:
+            buckets *= 2
+        self.size = 2 * buckets
+        self.bucket_mask = buckets - 1
+        self.memory_mb = memory_mb
+        self.age_offset = self.size * SHARED_ENTRY_BYTES
+        self.owner = name is None
+        if self.owner:
+            self.memory = shared_memory.SharedMemory(create=True, size=self.age_offset + 8)
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+        self.name = self.memory.name
+        self.buffer = self.memory.buf
+        self.stores = 0
+
+    def __reduce__(self):
+        return SharedTranspositionTable, (self.memory_mb, self.name)
+
+    @property
+    def age(self) -> int:
+        return self.buffer[self.age_offset]
+
+    def clear(self) -> None:
+        """
+        Empties the table.
+        """
+        self.buffer[: self.age_offset + 8] = bytes(self.age_offset + 8)
+        self.stores = 0
+
+    def new_search(self) -> None:
+        """
+        Starts a new search: entries of the previous searches become replaceable.
+        """
+        self.buffer[self.age_offset] = (self.age + 1) & 0xFF
+
+    def read(self, offset: int) -> Tuple[int, float, int]:
+        """
+        Reads the entry at an offset of the buffer from a single copy of its bytes.
+
+        Args:
+            offset (int): Offset of the entry in bytes
+
+        Returns:
+            Tuple[int, float, int]: key of the entry, score and data, the data is 0 for an empty entry
+        """
+        raw = self.buffer[offset : offset + SHARED_ENTRY_BYTES].tobytes()
+        check, score_bits, data = SHARED_ENTRY_WORDS.unpack(raw)
+        return check ^ score_bits ^ data, SHARED_ENTRY.unpack(raw)[1], data
+
+    def probe(self, key: int) -> Optional[Entry]:
+        """
+        Looks up an entry.
+
+        Args:
+            key (int): Zobrist hash of the state
+
+        Returns:
+            Optional[Entry]: (score, depth, bound, best move) of the state if found
+        """
+        offset = (key & self.bucket_mask) * 2 * SHARED_ENTRY_BYTES
+        entry_key, score, data = self.read(offset)
+        if entry_key != key or not data:
+            entry_key, score, data = self.read(offset + SHARED_ENTRY_BYTES)
+            if entry_key != key or not data:
+                return None
+        return (
+            score,
+            ((data >> DATA_DEPTH_SHIFT) & 0xFF) - DEPTH_OFFSET,
+            (data >> DATA_BOUND_SHIFT) & 3,
+            (data & DATA_MOVE_MASK) or None,
+        )
+
+    def store(self, key: int, score: float, depth: float, bound: int, move: Optional[Move]) -> None:
+        """
+        Writes an entry, following the two-tier replacement policy.
+
+        Args:
+            key (int): Zobrist hash of the state
+            score (float): Score of the state for the next player
+            depth (float): Depth of the search that computed the score (inf for terminal states)
+            bound (int): EXACT, LOWER_BOUND or UPPER_BOUND
+            move (Optional[Move]): Best move found, if any
+        """
+        depth = MAX_DEPTH if depth == inf else depth
+        age = self.age
+        offset = (key & self.bucket_mask) * 2 * SHARED_ENTRY_BYTES
+        entry_key, _, data = self.read(offset)
+        # The first slot keeps the deepest entry of the current search
+        if not (
+            entry_key == key
+            or depth >= ((data >> DATA_DEPTH_SHIFT) & 0xFF) - DEPTH_OFFSET
+            or (data >> DATA_AGE_SHIFT) & 0xFF != age
+        ):
+            offset += SHARED_ENTRY_BYTES
+            entry_key, _, data = self.read(offset)
+        if move is None:
+            move = data & DATA_MOVE_MASK if entry_key == key else NO_MOVE
+        data = (
+            move
+            | (depth + DEPTH_OFFSET) << DATA_DEPTH_SHIFT
+            | bound << DATA_BOUND_SHIFT
+            | age << DATA_AGE_SHIFT
+        )
+        score_bits = SCORE_BITS.unpack(SHARED_ENTRY.pack(0, score, 0)[8:16])[0]
+        SHARED_ENTRY.pack_into(self.buffer, offset, key ^ score_bits ^ data, score, data)
+        self.stores += 1
+
+    def close(self) -> None:
+        """
+        Detaches from the buffer, which is freed when the process that created it closes the table.
+        """
+        self.buffer.release()
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+    def __len__(self) -> int:
+        return sum(
+            1
+            for offset in range(0, self.age_offset, SHARED_ENTRY_BYTES)
+            if self.buffer[offset + 16 : offset + SHARED_ENTRY_BYTES] != bytes(8)
+        )
@@ -1,5 +1,7 @@
 from math import inf
-import copy
+
+from bitboard_abalone import BitBoardAbalone
+from geometry_abalone import DISTANCES_TO_CENTER, ENV_DISTANCES_TO_CENTER, ENV_NEIGHBOURS
 
 
 def manhattanDist(A, B):
@@ -35,15 +37,13 @@ def compute_normalized_distances_to_center(state):
     players_id = [player.get_id() for player in state.get_players()]
     final_rep = state.get_rep()
     env = final_rep.get_env()
-    dim = final_rep.get_dimensions()
     dist = dict.fromkeys(players_id, 0)
     pieces = dict.fromkeys(players_id, 0)
-    center = (dim[0]//2, dim[1]//2)
     for i, j in list(env.keys()):
         p = env.get((i, j), None)
         if p.get_owner_id():
             # divide distance by 5 as the max distance is 4
-            dist[p.get_owner_id()] += manhattanDist(center, (i, j)) / 5
+            dist[p.get_owner_id()] += ENV_DISTANCES_TO_CENTER[(i, j)] / 5
             pieces[p.get_owner_id()] += 1
     for player_id in players_id:
         dist[player_id] /= pieces[player_id]
@@ -58,14 +58,14 @@ def get_adjacency(state, player):
     normalized to be lower than 1 so that score remains more important
     return a dict with player_id as key and distance as value
     """
+    env = state.get_rep().get_env()
     pieces_pos = state.get_rep().get_pieces_player(player)[1]
     neighbourhood_scores = []
     max_piece_score = 6
     for piece in pieces_pos:
-        neighbours = state.get_neighbours(piece[0], piece[1])
         piece_score = 0
-        for key in neighbours:
-            if neighbours[key][0] == player.get_piece_type():
+        for neighbour in ENV_NEIGHBOURS[piece]:
+            if neighbour in env and env[neighbour].get_type() == player.get_piece_type():
                 piece_score += 1
         neighbourhood_scores.append(piece_score / max_piece_score)
     adjacency_score = sum(neighbourhood_scores) / len(neighbourhood_scores)
@@ -93,12 +93,12 @@ def get_adjacency2(state, player):
     normalized to be lower than 1 so that score remains more important
     return a dict with player_id as key and distance as value
     """
+    env = state.get_rep().get_env()
     pieces_pos = state.get_rep().get_pieces_player(player)[1]
     neighbourhood_scores = 0
     for piece in pieces_pos:
-        neighbours = state.get_neighbours(piece[0], piece[1])
         neighbourhood_scores += len(
-                [_ for _, neighbour in neighbours.items() if neighbour[0] == player.get_piece_type()]
+                [_ for _ in ENV_NEIGHBOURS[piece] if _ in env and env[_].get_type() == player.get_piece_type()]
         )
     adjacency_score = neighbourhood_scores / (6 * len(pieces_pos))
     return adjacency_score
@@ -120,71 +120,34 @@ def heuristic_adjacency(state):
 
 ## Pushes and ejections heuristic
 
-def get_avg_pushes(state, opponent):
-    """
-    Computes the average number of pushes available in this state for the player
-    by checking the differences in the positions of the player's pieces between 
-    this state and the next ones.
-    TODO: involves checking another level deep for both players so it's quite slow (O(n^2)?)
-    TODO: more efficient version by only computing places where a player outnumbers its opponent?
-    """
-    # Get the previous positions of the given player's pieces and their number
-    prev_nb, prev_pos = state.get_rep().get_pieces_player(opponent)
-
-    nb_pushes_list = []
-
-    # Check for each action if there are possible pushes
-    # i.e., changes in the next player's positions
-    for move in state.get_possible_actions():
-        new_state = move.get_next_game_state()
-        
-        # Differences in the positions of the given player's pieces
-        new_nb, new_pos = new_state.get_rep().get_pieces_player(opponent)
-        differences = set(new_pos).symmetric_difference(set(prev_pos))
-        
-        # Add the number of pieces pushed for this action
-        # normalized by the maximum number of pieces pushed (2)
-        nb_pushes = len(differences) / 2
-
-        # Count the number of ejections
-        nb_ejections = prev_nb - new_nb
-
-        # Define a ratio to ponder the pushes and ejections (ejections should be more important)
-        push_ratio = 0.2
-        nb_pushes_list.append(push_ratio*nb_pushes + (1-push_ratio)*nb_ejections)
-
-    # Get the average number of marbles pushed with actions possible from this state
-    nb_pushes_avg = 0
-    if len(nb_pushes_list) != 0:
-        nb_pushes_avg += sum(nb_pushes_list) / len(nb_pushes_list)
-    
-    return nb_pushes_avg
+# Weight of the pushes against the ejections in the push pressure (ejections should be more important)
+PUSH_RATIO = 0.2
 
-def heuristic_push(state):
+# Usual number of moves of a player when its pieces are in contact with the opponent's:
+# the push pressure is an average per move so that it stays smaller than the score and center features
+MOVE_COUNT = 48
+
+
+def get_push_pressure(board, side):
     """
-    Compute how many opponent's marbles can be pushed by moving (pressure)
-    TODO: Weigh the score so that an ejection is more important than just pushing
-    In game: if it's possible to move
-    or
-    In next state: the opponent's marbles will have moved
-    ==> Check in next node if the score changes for ejections
-    Normalized by the number of possible actions?
+    Computes the push pressure of a player on a BitBoardAbalone:
+    the sumitos (2-vs-1, 3-vs-1 and 3-vs-2) it could play, ejections weighted more than pushes,
+    divided by MOVE_COUNT.
+    The line patterns are read from the board directly, no successor state is generated
     """
-    # Get players' ids
-    opponent = state.get_next_player()
-    opponent_id = opponent.get_id()
-    player = get_opponent(state, opponent)
-    player_id = player.get_id()
-
-    # The next player in the state is the opponent because the player has just moved
-    # View the state as if the player was playing again to see how it can push from this new positions
-    state_from_player = copy.deepcopy(state)
-    state_from_player.next_player = state_from_player.compute_next_player()
+    pushes, ejections = board.count_pushes(side)
+    return (PUSH_RATIO * pushes + (1 - PUSH_RATIO) * ejections) / MOVE_COUNT
 
-    nb_pushes_avg = {player_id: get_avg_pushes(state_from_player, opponent), 
-                     opponent_id: get_avg_pushes(state, player)}
 
-    return nb_pushes_avg
+def heuristic_push(state):
+    """
+    Compute how many opponent's marbles can be pushed by each player (pressure),
+    as if each player was to play
+    return a dict with player_id as key and push pressure as value
+    """
+    players = state.get_players()
+    board = BitBoardAbalone.from_board(state.get_rep(), players)
+    return {player.get_id(): get_push_pressure(board, side) for side, player in enumerate(players)}
 
 
 def get_pushes2(state):
@@ -280,6 +243,53 @@ def heuristic_combined(state, heuristics_used):
 
 
 
+## Heuristics on SearchStateAbalone (in-place search)
+
+def search_state_distances_to_center(state):
+    """
+    Compute the distance to center of each player of a SearchStateAbalone
+    return a list indexed like the players of the game
+    """
+    dist = []
+    for mask in state.board.masks:
+        total = 0
+        while mask:
+            low = mask & -mask
+            total += DISTANCES_TO_CENTER[low.bit_length() - 1]
+            mask ^= low
+        dist.append(total)
+    return dist
+
+
+def search_state_score_and_distance_sym(state):
+    """
+    Same heuristic as score_and_distance_sym for a SearchStateAbalone
+    """
+    player = state.next_side
+    opponent = 1 - player
+    dist = search_state_distances_to_center(state)
+    # divide distance by 5 as the max distance is 4
+    # a player may have no piece left in the simplified layout
+    score_and_dist = state.scores[player] - dist[player] / 5 / (state.board.count_pieces(player) or 1)
+    opponent_score_and_dist = state.scores[opponent] - dist[opponent] / 5 / (state.board.count_pieces(opponent) or 1)
+    return score_and_dist - opponent_score_and_dist
+
+
+def search_state_terminal_score(state):
+    """
+    Computes the score of a final SearchStateAbalone for the next player
+    """
+    scores = state.scores
+    if scores[0] != scores[1]:
+        winner = 0 if scores[0] > scores[1] else 1
+    else:
+        dist = search_state_distances_to_center(state)
+        if dist[0] == dist[1]:
+            return 0
+        winner = 0 if dist[0] < dist[1] else 1
+    return inf if winner == state.next_side else -inf
+
+
 
 
 
@@ -350,13 +360,11 @@ def compute_distances_to_center(state):
     players_id = [player.get_id() for player in state.get_players()]
     final_rep = state.get_rep()
     env = final_rep.get_env()
-    dim = final_rep.get_dimensions()
     dist = dict.fromkeys(players_id, 0)
-    center = (dim[0]//2, dim[1]//2)
     for i, j in list(env.keys()):
         p = env.get((i, j), None)
         if p.get_owner_id():
-            dist[p.get_owner_id()] += manhattanDist(center, (i, j))
+            dist[p.get_owner_id()] += ENV_DISTANCES_TO_CENTER[(i, j)]
     return dist
 
 